@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Compile the gaze detector to a C extension with mypyc
+Run from the gaze_reporting folder; the compiled module is picked up instead of gaze_detector.py
+"""
+
+import sys
+import subprocess
+from pathlib import Path
+
+MODULES = ["eye_tracking/gaze_detector.py"]
+
+def install_mypy():
+    """Install mypy (which ships mypyc) if not present"""
+    try:
+        import mypy
+        print("✅ mypy already installed")
+        return True
+    except ImportError:
+        print("📦 Installing mypy...")
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "mypy"])
+            print("✅ mypy installed successfully")
+            return True
+        except subprocess.CalledProcessError:
+            print("❌ Failed to install mypy")
+            return False
+
+def build_extensions():
+    """Compile MODULES in place"""
+    print("🔨 Compiling with mypyc...")
+
+    missing = [m for m in MODULES if not Path(m).exists()]
+    if missing:
+        print(f"❌ Not found: {', '.join(missing)} (run from the gaze_reporting folder)")
+        return False
+
+    cmd = [sys.executable, "-m", "mypyc", *MODULES]
+    try:
+        print(f"Running: {' '.join(cmd)}")
+        subprocess.run(cmd, check=True)
+        print("✅ Compiled successfully!")
+        print("   Check with: python -X importtime -c \"import eye_tracking.gaze_detector\"")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Build failed: {e}")
+        return False
+
+def main():
+    if not install_mypy():
+        return 1
+    return 0 if build_extensions() else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,6 +30,8 @@ except ImportError:
     TTS_AVAILABLE = False
     print("pyttsx3 not available. Audio narration disabled.")
 
+_UPDOWN: frozenset = frozenset(('UP', 'DOWN'))
+
 class ComprehensiveGazeTester:
     def __init__(self, master, gaze_detector: GazeDetectorInterface):
         self.root = master
@@ -762,7 +764,7 @@ class ComprehensiveGazeTester:
             
         elif step['type'] == 'neutral_hold':
             # Count false detections (fewer is better)
-            false_detections = len([d for d in detections if d['direction'] in ['UP', 'DOWN']])
+            false_detections = sum(1 for d in detections if d['direction'] in _UPDOWN)
             elapsed_time = time.time() - self.step_data['start_time']
             target_duration = step.get('hold_duration', 5)
             progress = min(100, (elapsed_time / target_duration) * 100)
@@ -1541,7 +1543,7 @@ class ComprehensiveGazeTester:
             timestamp = time.strftime("%H:%M:%S")
             self.results_text.insert(tk.END, f"[{timestamp}] {message}\n")
             self.results_text.see(tk.END)
-            self.root.update()
+            self.root.update_idletasks()  # Redraw only - don't re-enter the event loop
             
             # Also log to file if we have a current step directory
             if hasattr(self, 'current_step_dir') and self.current_step_dir:
@@ -36,6 +36,7 @@ class CalibrationPopup:
         self.calibration_duration = calibration_duration
         self.is_active = False
         self.calibration_complete = False
+        self.done = threading.Event()  # Set once the popup has finished (completed or cancelled)
         self.start_time = None
         self.window_name = "GazeTalk_Calibration"
         self.thread = None
@@ -86,6 +87,7 @@ class CalibrationPopup:
         
         self.is_active = True
         self.calibration_complete = False
+        self.done.clear()
         self.start_time = time.time()
         
         # Reset gaze capture
@@ -184,6 +186,9 @@ class CalibrationPopup:
         except Exception as e:
             print(f"Error in calibration display: {e}")
             self.is_active = False
+        finally:
+            # Wake anyone waiting on the calibration
+            self.done.set()
     
     def _capture_gaze_sample(self):
         """Capture a gaze sample for baseline calculation"""
@@ -374,6 +379,13 @@ def is_calibration_complete():
         return False
     return calibration_popup.is_calibration_complete()
 
+def get_calibration_event():
+    """Get the event set when the current calibration finishes (None if not started)"""
+    global calibration_popup
+    if calibration_popup is not None:
+        return calibration_popup.done
+    return None
+
 def get_calibration_baseline():
     """Get the baseline from calibration"""
     global calibration_popup
@@ -1,60 +1,67 @@
 import time
 import numpy as np
 from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
 import sys
 import os
 
 from config import GAZE_CONFIG, CONTINUOUS_GAZE_CONFIG
 
 # Pure gaze detector - no external dependencies
+# Fully annotated so it can be compiled with mypyc (see builder/build_mypyc.py)
+
+_GAZE_CONFIG: Dict[str, Any] = GAZE_CONFIG
+_CONTINUOUS_GAZE_CONFIG: Dict[str, Any] = CONTINUOUS_GAZE_CONFIG
 
 class GazeDetector:
     """Detects up/down gaze movements using relative pupil position"""
     
-    def __init__(self, threshold_up=None, threshold_down=None, baseline_frames=None, cooldown_ms=None):
+    def __init__(self, threshold_up: Optional[float] = None, threshold_down: Optional[float] = None,
+                 baseline_frames: Optional[int] = None, cooldown_ms: Optional[float] = None) -> None:
         # Use config values or override with parameters
-        self.threshold_up = threshold_up or GAZE_CONFIG['threshold_up']
-        self.threshold_down = threshold_down or GAZE_CONFIG['threshold_down']
-        self.baseline_frames = baseline_frames or GAZE_CONFIG['baseline_frames']
-        self.cooldown_ms = cooldown_ms or GAZE_CONFIG['cooldown_ms']
-        self.arrow_colors = GAZE_CONFIG['arrow_colors']
+        self.threshold_up: float = threshold_up or _GAZE_CONFIG['threshold_up']
+        self.threshold_down: float = threshold_down or _GAZE_CONFIG['threshold_down']
+        self.baseline_frames: int = baseline_frames or _GAZE_CONFIG['baseline_frames']
+        self.cooldown_ms: float = cooldown_ms or _GAZE_CONFIG['cooldown_ms']
+        self.arrow_colors: List[Tuple[int, int, int]] = _GAZE_CONFIG['arrow_colors']
         
         # State variables
-        self.baseline_y = None
-        self.samples = []
-        self.last_gaze_time = 0
-        self.last_gaze_direction = None
-        self.current_color_index = 0
-        self.last_blink_time = 0
-        self.blink_recovery_ms = 400  # Wait 200ms after a blink before detecting gaze
-        self.baseline_stable_time = 0
-        self.baseline_stable_ms = 300  # Wait 300ms after baseline before detecting gaze
+        self.baseline_y: Optional[float] = None
+        self.samples: List[float] = []
+        self.last_gaze_time: float = 0
+        self.last_gaze_direction: Optional[str] = None
+        self.current_color_index: int = 0
+        self.last_blink_time: float = 0
+        self.blink_recovery_ms: float = 400  # Wait 200ms after a blink before detecting gaze
+        self.baseline_stable_time: float = 0
+        self.baseline_stable_ms: float = 300  # Wait 300ms after baseline before detecting gaze
         
         # Gaze state tracking - only fire once per continuous gaze
-        self.current_gaze_state = None  # "UP", "DOWN", or None
-        self.gaze_already_fired = False  # Prevent multiple fires for same gaze
+        self.current_gaze_state: Optional[str] = None  # "UP", "DOWN", or None
+        self.gaze_already_fired: bool = False  # Prevent multiple fires for same gaze
         
         # Continuous gaze tracking
-        self.gaze_start_time = 0  # When current gaze started
-        self.hold_threshold_ms = CONTINUOUS_GAZE_CONFIG['hold_threshold_ms']
-        self.is_continuous_gaze = False  # True when gaze held long enough for continuous firing
+        self.gaze_start_time: float = 0  # When current gaze started
+        self.hold_threshold_ms: float = _CONTINUOUS_GAZE_CONFIG['hold_threshold_ms']
+        self.is_continuous_gaze: bool = False  # True when gaze held long enough for continuous firing
+        self.current_gaze_duration_ms: float = 0
         
         # Smart recalibration state
-        self.recalibrating = False
-        self.head_was_moving = False
-        self.head_settled_time = 0
-        self.settle_wait_ms = 1000  # Wait 1 second after head stops before recalibrating
-        self.recalibration_frames = 0
-        self.recalibration_needed_frames = 30  # Same as baseline_frames
+        self.recalibrating: bool = False
+        self.head_was_moving: bool = False
+        self.head_settled_time: float = 0
+        self.settle_wait_ms: float = 1000  # Wait 1 second after head stops before recalibrating
+        self.recalibration_frames: int = 0
+        self.recalibration_needed_frames: int = 30  # Same as baseline_frames
         
         # Velocity detection for reading vs intentional movements
-        self.recent_positions = deque(maxlen=10)  # Last 10 frames (~300ms at 30fps)
-        self.velocity_threshold = 0.17  # Threshold for detecting fast movements (reading)
-        self.enable_velocity_filter = True  # Can be toggled on/off
+        self.recent_positions: Deque[float] = deque(maxlen=10)  # Last 10 frames (~300ms at 30fps)
+        self.velocity_threshold: float = 0.17  # Threshold for detecting fast movements (reading)
+        self.enable_velocity_filter: bool = True  # Can be toggled on/off
         
         # Pure gaze detection only
         
-    def reset(self):
+    def reset(self) -> None:
         """Reset gaze detection state"""
         self.baseline_y = None
         self.samples = []
@@ -69,7 +76,7 @@ class GazeDetector:
         self.is_continuous_gaze = False
         self.recent_positions.clear()
     
-    def reset_baseline(self):
+    def reset_baseline(self) -> None:
         """Reset the gaze baseline (called when head moves or blinks)"""
         self.baseline_y = None
         self.samples.clear()
@@ -81,26 +88,26 @@ class GazeDetector:
     
     # Pure gaze detection methods only
     
-    def calculate_velocity(self):
+    def calculate_velocity(self) -> float:
         """Calculate recent eye movement velocity"""
         if len(self.recent_positions) < 3:
             return 0.0
             
         # Calculate average velocity over recent frames
-        velocities = []
+        velocities: List[float] = []
         for i in range(1, len(self.recent_positions)):
             prev_pos = self.recent_positions[i-1]
             curr_pos = self.recent_positions[i]
             velocity = abs(curr_pos - prev_pos)
             velocities.append(velocity)
             
-        return np.mean(velocities) if velocities else 0.0
+        return float(np.mean(velocities)) if velocities else 0.0
     
-    def is_reading_movement(self, velocity):
+    def is_reading_movement(self, velocity: float) -> bool:
         """Detect if current movement looks like reading (fast/jerky)"""
         return self.enable_velocity_filter and velocity > self.velocity_threshold
     
-    def update(self, pupil_relative, head_moving=False, is_blinking=False):
+    def update(self, pupil_relative: float, head_moving: bool = False, is_blinking: bool = False) -> Dict[str, Any]:
         """Update gaze detection with new pupil position"""
         now_ms = time.time() * 1000.0
         
@@ -237,7 +244,7 @@ class GazeDetector:
             }
         
         # Determine current physical gaze state with hysteresis
-        current_physical_state = None
+        current_physical_state: Optional[str] = None
         
         # Use moderate hysteresis to prevent false opposite direction detections
         if self.current_gaze_state == "UP":
@@ -326,7 +333,7 @@ class GazeDetector:
             'disabled_reason': None
         }
     
-    def get_baseline_status(self):
+    def get_baseline_status(self) -> str:
         """Get current baseline status for display"""
         if self.baseline_y is None:
             return f"GAZE CALIB: {len(self.samples)}/{self.baseline_frames}"
@@ -9,6 +9,12 @@ import threading
 from typing import Dict, Any, Optional, Tuple
 from gaze_detector_interface import GazeDetectorInterface
 
+# Fixed part of a gaze result per direction; each result is a fresh copy of one
+_RESULT_BASE = {
+    direction: {'direction': direction, 'offset': offset, 'pupil_relative': (0.5, pupil_y), 'confidence': 0.9}
+    for direction, offset, pupil_y in (('UP', 0.02, 0.3), ('DOWN', -0.02, 0.7), (None, 0, 0.5))
+}
+
 class SimulatedGazeDetector(GazeDetectorInterface):
     """Simulated gaze detector for testing and simulation"""
     
@@ -201,18 +207,13 @@ class SimulatedGazeDetector(GazeDetectorInterface):
         )
     
     def _create_gaze_result(self, direction: Optional[str], is_continuous: bool, gaze_detected: bool) -> Dict[str, Any]:
-        """Create a gaze result dictionary"""
-        return {
-            'direction': direction,
-            'offset': 0.02 if direction == 'UP' else -0.02 if direction == 'DOWN' else 0,
-            'is_continuous_gaze': is_continuous,
-            'gaze_detected': gaze_detected,
-            'pupil_relative': (
-                0.5, 
-                0.3 if direction == 'UP' else 0.7 if direction == 'DOWN' else 0.5
-            ),
-            'confidence': 0.9
-        }
+        """Create a gaze result dictionary (a new one per call - update() runs on several threads)"""
+        base = _RESULT_BASE.get(direction)
+        # Any other direction keeps the neutral offset/pupil, as before
+        result = base.copy() if base else dict(_RESULT_BASE[None], direction=direction)
+        result['is_continuous_gaze'] = is_continuous
+        result['gaze_detected'] = gaze_detected
+        return result
     
     def calibrate(self, frame_data: Dict[str, Any]) -> bool:
         """Mock calibration - always succeeds"""
@@ -12,8 +12,10 @@ import time
 import json
 import os
 from datetime import datetime
+from typing import NamedTuple, Optional
 import mediapipe as mp
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 # Import our existing components
 from eye_tracking.face_landmarks import FaceLandmarks
@@ -27,6 +29,52 @@ except ImportError:
     TTS_AVAILABLE = False
     print("pyttsx3 not available. Audio narration disabled.")
 
+# Try to import numba for the sequence pattern scan (NumPy is used otherwise)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+class GazeResult(NamedTuple):
+    """Fixed-field gaze result; process_step_gaze also accepts the detector's dicts"""
+    direction: Optional[str]
+    offset: float
+    is_continuous_gaze: bool
+    gaze_detected: bool
+    pupil_relative: tuple
+    confidence: float
+
+# Direction codes for vectorized detection scans
+DIRECTION_CODES = {'UP': 1, 'DOWN': -1}
+_UPDOWN = frozenset(DIRECTION_CODES)
+
+def encode_directions(directions):
+    """Encode a sequence of direction strings as int8 (UP=1, DOWN=-1, else 0)"""
+    return np.fromiter((DIRECTION_CODES.get(d, 0) for d in directions), dtype=np.int8)
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, boundscheck=False)
+    def _count_pattern_jit(arr, pattern):
+        count = 0
+        n = pattern.shape[0]
+        for i in range(arr.shape[0] - n + 1):
+            for j in range(n):
+                if arr[i + j] != pattern[j]:
+                    break
+            else:
+                count += 1
+        return count
+
+def count_pattern(arr, pattern):
+    """Count (overlapping) occurrences of an encoded pattern in an encoded direction array"""
+    if len(pattern) == 0 or len(arr) < len(pattern):
+        return 0
+    if NUMBA_AVAILABLE:
+        return int(_count_pattern_jit(arr, pattern))
+    windows = sliding_window_view(arr, len(pattern))
+    return int((windows == pattern).all(axis=1).sum())
+
 class ComprehensiveGazeTester:
     def __init__(self, master):
         self.root = master
@@ -602,13 +650,20 @@ class ComprehensiveGazeTester:
             return
         
         # Process both new gaze detections and continuous gaze states
-        direction = gaze_result.get('direction')
-        is_continuous = gaze_result.get('is_continuous_gaze', False)
-        gaze_detected = gaze_result.get('gaze_detected', False)
+        if type(gaze_result) is GazeResult:
+            direction = gaze_result.direction
+            offset = gaze_result.offset
+            is_continuous = gaze_result.is_continuous_gaze
+            gaze_detected = gaze_result.gaze_detected
+        else:
+            direction = gaze_result.get('direction')
+            offset = gaze_result.get('offset', 0)
+            is_continuous = gaze_result.get('is_continuous_gaze', False)
+            gaze_detected = gaze_result.get('gaze_detected', False)
         
         # Debug: Print all gaze results to console (disabled for production)
         # if direction:
-        #     print(f"[DEBUG] GAZE: {direction} | continuous: {is_continuous} | detected: {gaze_detected} | offset: {gaze_result.get('offset', 0):.3f}")
+        #     print(f"[DEBUG] GAZE: {direction} | continuous: {is_continuous} | detected: {gaze_detected} | offset: {offset:.3f}")
         
         # Handle neutral gaze (no direction) - reset hold tracking
         if not direction and hasattr(self, 'step_data') and self.step_data:
@@ -627,7 +682,7 @@ class ComprehensiveGazeTester:
                 detection = {
                     'timestamp': time.time() - self.step_data['start_time'],
                     'direction': direction,
-                    'offset': gaze_result.get('offset', 0),
+                    'offset': offset,
                     'is_continuous': is_continuous
                 }
                 
@@ -747,6 +802,13 @@ class ComprehensiveGazeTester:
                     # Cancel the timer and complete step immediately
                     self.complete_current_step()
     
+    def process_step_gaze_batch(self, gaze_results):
+        """Process several gaze results in order, stopping once the step has ended"""
+        for gaze_result in gaze_results:
+            if not getattr(self, 'step_data', None):
+                break
+            self.process_step_gaze(gaze_result)
+    
     def update_step_progress(self):
         """Update progress for current step with detailed counts"""
         if not hasattr(self, 'step_data') or not self.step_data:
@@ -802,7 +864,7 @@ class ComprehensiveGazeTester:
             
         elif step['type'] == 'neutral_hold':
             # Count false detections (fewer is better)
-            false_detections = len([d for d in detections if d['direction'] in ['UP', 'DOWN']])
+            false_detections = sum(1 for d in detections if d['direction'] in _UPDOWN)
             elapsed_time = time.time() - self.step_data['start_time']
             target_duration = step.get('hold_duration', 5)
             
@@ -957,21 +1019,16 @@ class ComprehensiveGazeTester:
             return len(down_holds) >= step.get('repetitions', 3)
         
         elif step_type == 'neutral_hold':
-            false_detections = [d for d in detections if d['direction'] in ['UP', 'DOWN']]
-            return len(false_detections) < 3
+            arr = encode_directions(d['direction'] for d in detections)
+            return int(np.count_nonzero(arr)) < 3
         
         elif step_type.startswith('sequence_'):
-            # Analyze sequence patterns
-            directions = [d['direction'] for d in detections if d['direction']]
-            pattern = step.get('pattern', [])
+            # Analyze sequence patterns on the encoded directions
+            arr = encode_directions(d['direction'] for d in detections if d['direction'])
+            pattern = encode_directions(step.get('pattern', []))
             repetitions = step.get('repetitions', 3)
             
-            found_patterns = 0
-            for i in range(len(directions) - len(pattern) + 1):
-                if directions[i:i+len(pattern)] == pattern:
-                    found_patterns += 1
-            
-            return found_patterns >= repetitions
+            return count_pattern(arr, pattern) >= repetitions
         
         return True
     
@@ -23,6 +23,7 @@ import subprocess
 import sys
 import signal
 import atexit
+from collections import deque
 from datetime import datetime
 import numpy as np
 from typing import Optional, Dict, Any
@@ -70,9 +71,9 @@ class ComprehensiveGazeTesterV2:
         
         # TTS
         self.tts_engine = None
-        self.tts_queue = []
+        self.tts_queue = deque()
         self.tts_speaking = False
-        self.tts_callbacks = []
+        self.tts_callbacks = deque()
         self.max_tts_length = 200
         self.tts_timeout_timer = None
         
@@ -297,7 +298,7 @@ class ComprehensiveGazeTesterV2:
         self.root.lift()
         self.root.focus_force()
         self.root.attributes('-topmost', True)
-        self.root.update()
+        # No update() here - the after() below already lets Tk redraw
         self.root.after(100, lambda: self.root.attributes('-topmost', False))  # Remove topmost after display
     
     def execute_current_step(self):
@@ -344,7 +345,8 @@ class ComprehensiveGazeTesterV2:
         else:
             instruction_text = f"STEP {self.current_step + 1}/{len(self.test_steps)}\n\n{step['name'].upper()}\n\n{step['instruction']}"
             self.instruction_display.config(text=instruction_text, fg="white", bg="darkblue")
-            self.root.update()
+            # Only flush drawing - a full update() would run pending after() callbacks re-entrantly
+            self.root.update_idletasks()
         
         # Force window to front for each step
         self._force_to_front()
@@ -555,7 +557,7 @@ class ComprehensiveGazeTesterV2:
         """Process TTS queue"""
         if not self.tts_speaking and self.tts_queue:
             self.tts_speaking = True
-            text = self.tts_queue.pop(0)
+            text = self.tts_queue.popleft()
             
             # Set timeout
             self.tts_timeout_timer = self.root.after(10000, self._tts_timeout)
@@ -585,11 +587,12 @@ class ComprehensiveGazeTesterV2:
             self.tts_timeout_timer = None
         
         if self.tts_callbacks:
-            callback = self.tts_callbacks.pop(0)
+            callback = self.tts_callbacks.popleft()
             self.root.after(0, callback)
         
+        # Start the next utterance right away instead of waiting on a timer
         if self.tts_queue:
-            self.root.after(100, self._process_tts_queue)
+            self._process_tts_queue()
     
     def play_beep_async(self):
         """Play beep sound"""
@@ -14,12 +14,16 @@ from unittest.mock import patch, MagicMock
 # Add the current directory to the path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Shared blank frame - read-only so every mock read can hand out the same buffer
+_MOCK_FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+_MOCK_FRAME.setflags(write=False)
+
 def create_mock_objects():
     """Create mock objects for camera and mediapipe"""
     # Mock cv2
     mock_cv2 = MagicMock()
     mock_camera = MagicMock()
-    mock_camera.read.return_value = (True, np.zeros((480, 640, 3), dtype=np.uint8))
+    mock_camera.read.return_value = (True, _MOCK_FRAME)
     mock_camera.isOpened.return_value = True
     mock_cv2.VideoCapture.return_value = mock_camera
     mock_cv2.VideoWriter.return_value = MagicMock()
@@ -71,8 +75,8 @@ def run_simulation():
         # Override the camera update method to use simulated inputs
         def simulated_camera_update():
             """Simulated camera update that generates fake gaze data"""
-            # Create a fake frame
-            fake_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+            # Reuse the shared blank frame
+            fake_frame = _MOCK_FRAME
             
             # Simulate face landmarks
             if hasattr(tester, 'face_landmarks'):
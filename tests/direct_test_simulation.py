@@ -4,214 +4,293 @@ Direct simulation of the comprehensive gaze tester
 This patches the actual tester to simulate inputs and verify auto-advance
 """
 
+import io
 import time
 import sys
 import os
 import threading
+from dataclasses import dataclass, field
+from functools import cached_property
+from types import MappingProxyType, SimpleNamespace
+from typing import Optional
 from unittest.mock import patch, MagicMock
 import numpy as np
 
 # Add the current directory to the path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Blank camera frame shared by every mock camera - never written to
+_BLANK_FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+_BLANK_FRAME.setflags(write=False)
+
+# MediaPipe result with no face found
+_BLANK_RESULT = SimpleNamespace(multi_face_landmarks=None)
+
+def _build_gaze_input(direction, is_continuous, gaze_detected):
+    """Build a read-only simulated gaze payload"""
+    return MappingProxyType({
+        'direction': direction,
+        'offset': 0.02 if direction == 'UP' else -0.02 if direction == 'DOWN' else 0,
+        'is_continuous_gaze': is_continuous,
+        'gaze_detected': gaze_detected,
+        'pupil_relative': (0.5, 0.3 if direction == 'UP' else 0.7 if direction == 'DOWN' else 0.5),
+        'confidence': 0.9
+    })
+
+# process_step_gaze only reads the payload, so every combination is built once and shared
+_PRECOMPUTED = {
+    (direction, is_continuous, gaze_detected): _build_gaze_input(direction, is_continuous, gaze_detected)
+    for direction in ('UP', 'DOWN', None)
+    for is_continuous in (False, True)
+    for gaze_detected in (False, True)
+}
+
+def create_mock_objects():
+    """Create all the mock objects needed"""
+    # Mock cv2
+    mock_cv2 = MagicMock()
+    # Passive return-value holders use plain namespaces - MagicMock is
+    # kept only for the module objects whose attributes are open-ended
+    mock_camera = SimpleNamespace(
+        read=lambda: (True, _BLANK_FRAME),
+        isOpened=lambda: True,
+        set=lambda prop, value: True,
+        release=lambda: None
+    )
+    mock_cv2.VideoCapture.return_value = mock_camera
+    mock_cv2.VideoWriter.return_value = SimpleNamespace(
+        write=lambda frame: None,
+        isOpened=lambda: True,
+        release=lambda: None
+    )
+    
+    # Mock mediapipe
+    mock_mp = MagicMock()
+    mock_face_detection = SimpleNamespace(process=lambda frame: _BLANK_RESULT)
+    mock_face_mesh = SimpleNamespace(process=lambda frame: _BLANK_RESULT)
+    mock_mp.solutions.face_detection = MagicMock(return_value=mock_face_detection)
+    mock_mp.solutions.face_mesh = MagicMock(return_value=mock_face_mesh)
+    
+    # Mock tkinter
+    mock_tk = MagicMock()
+    mock_root = MagicMock()
+    mock_tk.Tk.return_value = mock_root
+    
+    return mock_cv2, mock_mp, mock_tk
+
+# cv2/mediapipe/tkinter are mocked only while the tester module is imported -
+# it binds the mocks at import time, and sys.modules is restored afterwards
+_MOCK_CV2, _MOCK_MP, _MOCK_TK = create_mock_objects()
+with patch.dict(sys.modules, {'cv2': _MOCK_CV2, 'mediapipe': _MOCK_MP, 'tkinter': _MOCK_TK}):
+    from comprehensive_gaze_tester import ComprehensiveGazeTester
+
+# Neutral break between holds - only the first neutral frame resets hold
+# tracking, so one frame covers the whole 0.5s break
+_NEUTRAL_BREAK = (_PRECOMPUTED[(None, False, False)],)
+
+class FakeClock:
+    """Virtual clock so simulated holds don't burn real wall time"""
+    def __init__(self, start=0.0):
+        self._now = start
+        
+    def now(self):
+        return self._now
+        
+    def advance(self, dt):
+        self._now += dt
+
+@dataclass(slots=True)
+class SimulationState:
+    """Simulation bookkeeping with a fixed set of fields"""
+    current_step: int = 0
+    step_data: Optional[dict] = None
+    test_results: list = field(default_factory=list)
+    step_retry_count: int = 0
+    max_retries: int = 3
+    step_start_time: Optional[float] = None
+
 class DirectTestSimulator:
     def __init__(self):
-        self.tester = None
-        self.simulation_data = {
-            'current_step': 0,
-            'step_data': None,
-            'test_results': [],
-            'step_retry_count': 0,
-            'max_retries': 3,
-            'current_step': 0,
-            'step_start_time': None
-        }
-        
-    def create_mock_objects(self):
-        """Create all the mock objects needed"""
-        # Mock cv2
-        mock_cv2 = MagicMock()
-        mock_camera = MagicMock()
-        mock_camera.read.return_value = (True, np.zeros((480, 640, 3), dtype=np.uint8))
-        mock_camera.isOpened.return_value = True
-        mock_cv2.VideoCapture.return_value = mock_camera
-        mock_cv2.VideoWriter.return_value = MagicMock()
-        
-        # Mock mediapipe
-        mock_mp = MagicMock()
-        mock_face_detection = MagicMock()
-        mock_face_mesh = MagicMock()
-        mock_face_detection.process.return_value = MagicMock()
-        mock_face_mesh.process.return_value = MagicMock()
-        mock_mp.solutions.face_detection = MagicMock(return_value=mock_face_detection)
-        mock_mp.solutions.face_mesh = MagicMock(return_value=mock_face_mesh)
-        
-        # Mock tkinter
-        mock_tk = MagicMock()
-        mock_root = MagicMock()
-        mock_tk.Tk.return_value = mock_root
-        
-        return mock_cv2, mock_mp, mock_tk
+        self.state = SimulationState()
+        self._log_buf = io.StringIO()
         
-    def simulate_gaze_input(self, direction, is_continuous=False, gaze_detected=True):
-        """Simulate a gaze input"""
-        gaze_result = {
-            'direction': direction,
-            'offset': 0.02 if direction == 'UP' else -0.02 if direction == 'DOWN' else 0,
-            'is_continuous_gaze': is_continuous,
-            'gaze_detected': gaze_detected,
-            'pupil_relative': (0.5, 0.3 if direction == 'UP' else 0.7 if direction == 'DOWN' else 0.5),
-            'confidence': 0.9
-        }
-        return gaze_result
+    def _log(self, message):
+        """Buffer test output; written out in one go by _flush_log()"""
+        self._log_buf.write(message + "\n")
         
-    def test_hold_detection_logic(self):
-        """Test the hold detection logic directly"""
-        print("🧪 Testing Hold Detection Logic Directly")
-        print("=" * 50)
+    def _flush_log(self):
+        """Write buffered test output to stdout"""
+        sys.stdout.write(self._log_buf.getvalue())
+        sys.stdout.flush()
+        self._log_buf.seek(0)
+        self._log_buf.truncate()
+        
+    @cached_property
+    def tester(self):
+        """Build one ComprehensiveGazeTester, shared by both tests"""
+        tester = ComprehensiveGazeTester(_MOCK_TK.Tk())
+        self._watch_holds(tester)
+        return tester
         
-        # Import the comprehensive gaze tester
-        from comprehensive_gaze_tester import ComprehensiveGazeTester
+    def _watch_holds(self, tester):
+        """Wrap process_step_gaze so a completed hold sets tester.on_hold_complete"""
+        tester.on_hold_complete = threading.Event()
+        tester.last_hold = None
+        process_step_gaze = tester.process_step_gaze
         
-        # Create a minimal tester instance
-        tester = ComprehensiveGazeTester()
+        def watched_process_step_gaze(gaze_result):
+            # Grab the list first - completing the step deletes step_data
+            detections = tester.step_data['detections']
+            count = len(detections)
+            process_step_gaze(gaze_result)
+            if len(detections) > count and detections[-1].get('hold_duration', 0) > 0:
+                tester.last_hold = detections[-1]
+                tester.on_hold_complete.set()
         
-        # Set up test data
+        tester.process_step_gaze = watched_process_step_gaze
+        
+    def _reset_tester(self, steps, start_time):
+        """Reset the shared tester to the given steps without re-running its constructor"""
+        tester = self.tester
         tester.current_step = 0
-        tester.test_steps = [
-            {
-                'name': 'Long UP Holds',
-                'type': 'long_up',
-                'repetitions': 3,
-                'hold_duration': 5
-            }
-        ]
-        
-        tester.step_data = {
+        tester.test_steps.clear()
+        tester.test_steps.extend(steps)
+        
+        # complete_current_step() deletes step_data, so recreate it if needed
+        step_data = getattr(tester, 'step_data', None)
+        if step_data is None:
+            step_data = tester.step_data = {}
+        step_data.clear()
+        tester.on_hold_complete.clear()
+        step_data.update({
             'detections': [],
-            'start_time': time.time(),
+            'start_time': start_time,
             'current_gaze_state': None,
             'hold_start_time': None
-        }
+        })
+        return tester
         
-        print("Testing single 5-second UP hold...")
+    def simulate_gaze_input(self, direction, is_continuous=False, gaze_detected=True):
+        """Simulate a gaze input"""
+        return _PRECOMPUTED[(direction, is_continuous, gaze_detected)]
         
-        # Simulate 5 seconds of UP gaze
-        start_time = time.time()
-        hold_completed = False
+    def test_hold_detection_logic(self):
+        """Test the hold detection logic directly"""
+        self._log("🧪 Testing Hold Detection Logic Directly")
+        self._log("=" * 50)
         
-        while time.time() - start_time < 6 and not hold_completed:
-            gaze_result = self.simulate_gaze_input('UP', is_continuous=True, gaze_detected=False)
+        clock = FakeClock(time.perf_counter())
+        
+        with patch('time.time', clock.now):
+            tester = self._reset_tester([
+                {
+                    'name': 'Long UP Holds',
+                    'type': 'long_up',
+                    'repetitions': 3,
+                    'hold_duration': 5
+                }
+            ], clock.now())
+            
+            self._log("Testing single 5-second UP hold...")
+            
+            # Simulate up to 6 seconds of UP gaze in 100ms virtual ticks
+            hold_completed = False
+            up_gaze = self.simulate_gaze_input('UP', is_continuous=True, gaze_detected=False)
             
-            # Call the process_step_gaze method
             try:
-                tester.process_step_gaze(gaze_result)
-                
-                # Check if hold was completed
-                if len(tester.step_data['detections']) > 0:
-                    last_detection = tester.step_data['detections'][-1]
-                    if last_detection.get('hold_duration', 0) > 0:
+                for _ in range(60):
+                    clock.advance(0.1)
+                    
+                    # Call the process_step_gaze method
+                    tester.process_step_gaze(up_gaze)
+                    
+                    # Check if hold was completed
+                    if tester.on_hold_complete.is_set():
                         hold_completed = True
-                        print(f"✅ Hold completed: {last_detection['hold_duration']:.1f}s")
-                        
+                        self._log(f"✅ Hold completed: {tester.last_hold['hold_duration']:.1f}s")
+                        break
+                            
             except Exception as e:
-                print(f"❌ Error processing gaze: {e}")
-                break
-                
-            time.sleep(0.1)
+                self._log(f"❌ Error processing gaze: {e}")
+                self._flush_log()
+                return False
             
         if hold_completed:
-            print("✅ Single hold test PASSED")
+            self._log("✅ Single hold test PASSED")
         else:
-            print("❌ Single hold test FAILED")
+            self._log("❌ Single hold test FAILED")
             
+        self._flush_log()
         return hold_completed
         
     def test_auto_advance_logic(self):
         """Test the auto-advance logic"""
-        print("\n🧪 Testing Auto-Advance Logic")
-        print("=" * 40)
+        self._log("\n🧪 Testing Auto-Advance Logic")
+        self._log("=" * 40)
         
-        from comprehensive_gaze_tester import ComprehensiveGazeTester
+        clock = FakeClock(time.perf_counter())
         
-        tester = ComprehensiveGazeTester()
-        
-        # Set up test data
-        tester.current_step = 0
-        tester.test_steps = [
-            {
-                'name': 'Long UP Holds',
-                'type': 'long_up',
-                'repetitions': 3,
-                'hold_duration': 5
-            },
-            {
-                'name': 'Long DOWN Holds',
-                'type': 'long_down',
-                'repetitions': 3,
-                'hold_duration': 5
-            }
-        ]
-        
-        tester.step_data = {
-            'detections': [],
-            'start_time': time.time(),
-            'current_gaze_state': None,
-            'hold_start_time': None
-        }
-        
-        print("Testing 3 long UP holds with auto-advance...")
-        
-        # Simulate 3 holds
-        for hold_num in range(3):
-            print(f"\nHold {hold_num + 1}/3:")
+        with patch('time.time', clock.now):
+            tester = self._reset_tester([
+                {
+                    'name': 'Long UP Holds',
+                    'type': 'long_up',
+                    'repetitions': 3,
+                    'hold_duration': 5
+                },
+                {
+                    'name': 'Long DOWN Holds',
+                    'type': 'long_down',
+                    'repetitions': 3,
+                    'hold_duration': 5
+                }
+            ], clock.now())
             
-            # Simulate 5 seconds of UP gaze
-            start_time = time.time()
-            hold_completed = False
+            self._log("Testing 3 long UP holds with auto-advance...")
             
-            while time.time() - start_time < 6 and not hold_completed:
-                gaze_result = self.simulate_gaze_input('UP', is_continuous=True, gaze_detected=False)
-                
-                try:
-                    tester.process_step_gaze(gaze_result)
-                    
-                    # Check if hold was completed
-                    if len(tester.step_data['detections']) > 0:
-                        last_detection = tester.step_data['detections'][-1]
-                        if last_detection.get('hold_duration', 0) > 0:
-                            hold_completed = True
-                            print(f"  ✅ Hold {hold_num + 1} completed: {last_detection['hold_duration']:.1f}s")
-                            
-                except Exception as e:
-                    print(f"  ❌ Error: {e}")
-                    break
+            up_gaze = self.simulate_gaze_input('UP', is_continuous=True, gaze_detected=False)
+            
+            # Simulate 3 holds
+            try:
+                for hold_num in range(3):
+                    self._log(f"\nHold {hold_num + 1}/3:")
                     
-                time.sleep(0.1)
+                    # Simulate up to 6 seconds of UP gaze in 100ms virtual ticks
+                    tester.on_hold_complete.clear()
+                    for _ in range(60):
+                        clock.advance(0.1)
+                        tester.process_step_gaze(up_gaze)
+                        
+                        # Check if hold was completed
+                        if tester.on_hold_complete.is_set():
+                            self._log(f"  ✅ Hold {hold_num + 1} completed: {tester.last_hold['hold_duration']:.1f}s")
+                            break
+                        
+                    # Brief neutral break between holds
+                    if hold_num < 2:
+                        clock.advance(0.5)
+                        tester.process_step_gaze_batch(_NEUTRAL_BREAK)
+                        
+            except Exception as e:
+                self._log(f"  ❌ Error: {e}")
+                self._flush_log()
+                return False
                 
-            # Brief neutral break between holds
-            if hold_num < 2:
-                for _ in range(5):
-                    neutral_result = self.simulate_gaze_input(None, is_continuous=False, gaze_detected=False)
-                    try:
-                        tester.process_step_gaze(neutral_result)
-                    except:
-                        pass
-                    time.sleep(0.1)
-                    
-        # Check if step completion is detected
-        try:
-            is_complete = tester.check_step_completion()
-            print(f"\nStep completion check: {is_complete}")
-            
-            if is_complete:
-                print("✅ Auto-advance logic working correctly")
-            else:
-                print("❌ Auto-advance logic not working")
+            # Check if step completion is detected
+            try:
+                is_complete = tester.check_step_completion()
+                self._log(f"\nStep completion check: {is_complete}")
                 
-        except Exception as e:
-            print(f"❌ Error checking step completion: {e}")
+                if is_complete:
+                    self._log("✅ Auto-advance logic working correctly")
+                else:
+                    self._log("❌ Auto-advance logic not working")
+                    
+            except Exception as e:
+                self._log(f"❌ Error checking step completion: {e}")
+                is_complete = False
             
+        self._flush_log()
         return is_complete
         
     def run_comprehensive_test(self):
@@ -219,6 +298,10 @@ class DirectTestSimulator:
         print("🎭 Comprehensive Gaze Tester Direct Simulation")
         print("=" * 60)
         
+        # The tests run back to back on purpose: they share one tester and
+        # each patches time.time globally, and with the fake clock there
+        # is no sleeping left for threads to overlap
+        
         # Test 1: Hold detection logic
         hold_test_passed = self.test_hold_detection_logic()
         
@@ -13,8 +13,15 @@ import time
 import threading
 import json
 import os
+import hashlib
+import queue
+import shutil
+import subprocess
+from collections import deque
+from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
 import sys
 
 # Add project root to path
@@ -36,25 +43,398 @@ except ImportError:
     TTS_AVAILABLE = False
     print("⚠️ pyttsx3 not available. Audio narration disabled.")
 
+# Try to import a WAV player for pre-rendered prompts
+try:
+    import simpleaudio
+    SIMPLEAUDIO_AVAILABLE = True
+except ImportError:
+    SIMPLEAUDIO_AVAILABLE = False
+
+try:
+    import winsound
+    WINSOUND_AVAILABLE = True
+except ImportError:
+    WINSOUND_AVAILABLE = False
+
+TTS_CACHE_DIR = PROJECT_ROOT / "tts_cache"
+
+# Overlay drawing constants, looked up once instead of on every frame
+_FONT = cv2.FONT_HERSHEY_SIMPLEX
+_LINE_AA = cv2.LINE_AA
+_ARROW_TABLE = {'UP': (0, -50, (0, 255, 0)),    # Green
+                'DOWN': (0, 50, (0, 0, 255))}   # Red
+_ARROW_DEFAULT = (0, 0, (128, 128, 128))         # Gray
+
+# Native capture backend (MSMF on Windows, V4L2 on Linux)
+if sys.platform.startswith('win'):
+    CAPTURE_API = cv2.CAP_MSMF
+elif sys.platform.startswith('linux'):
+    CAPTURE_API = cv2.CAP_V4L2
+else:
+    CAPTURE_API = cv2.CAP_ANY
+
+# Optional MediaPipe Tasks FaceLandmarker (GPU delegate when available); set
+# NAVIGAZE_FACE_LANDMARKER=1 and put the model next to this script to enable it
+USE_FACE_LANDMARKER = os.environ.get('NAVIGAZE_FACE_LANDMARKER') == '1'
+FACE_LANDMARKER_MODEL = PROJECT_ROOT / "face_landmarker.task"
+
+# Preallocated frames reused round-robin. The capture ring only has to outlive one
+# UI tick; the pipeline rings also cover frames waiting in an FfmpegSink queue.
+CAPTURE_RING_SIZE = 4
+FRAME_RING_SIZE = 8
+
+# FaceMesh runs at this rate; the UI polls for new frames at ~60 Hz
+INFER_HZ = 15
+UI_INTERVAL_MS = 16
+# Update rate GazeDetector's frame-counted thresholds are tuned for
+DETECTOR_REF_HZ = 30
+
+def scale_detector_to_rate(detector, hz):
+    """Rescale GazeDetector's per-update thresholds so they keep their timing at hz updates/s.
+    
+    Baseline, recalibration and the velocity window are counted in updates, and
+    the velocity threshold is a per-update movement; the hold/cooldown thresholds
+    are in milliseconds and need no change.
+    """
+    ratio = hz / DETECTOR_REF_HZ
+    detector.baseline_frames = max(3, round(detector.baseline_frames * ratio))
+    detector.recalibration_needed_frames = max(3, round(detector.recalibration_needed_frames * ratio))
+    window = max(3, round(detector.recent_positions.maxlen * ratio))
+    detector.recent_positions = deque(detector.recent_positions, maxlen=window)
+    # Fewer updates per second -> proportionally larger movement between them
+    detector.velocity_threshold /= ratio
+
+# Try to import orjson for faster report serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def dump_json_bytes(obj, indent=False):
+    """Serialize obj to UTF-8 JSON bytes, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=str, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=str).encode('utf-8')
+
+# Try to import PIL (only needed when the camera preview is shown)
+try:
+    from PIL import Image, ImageTk
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Try to import numba for the per-frame bookkeeping helpers
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Fallback no-op decorator so the helpers run as plain Python"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Detection direction codes stored in the step buffers
+DIR_NONE, DIR_NEUTRAL, DIR_UP, DIR_DOWN = -1, 0, 1, 2
+DIR_CODE = {'NEUTRAL': DIR_NEUTRAL, 'UP': DIR_UP, 'DOWN': DIR_DOWN}
+SEQUENCE_PATTERN = [DIR_UP, DIR_DOWN, DIR_UP, DIR_DOWN]
+
+@njit(cache=True)
+def running_mean(buf, n):
+    """Mean of the first n samples in buf"""
+    total = 0.0
+    for i in range(n):
+        total += buf[i]
+    return total / n
+
+
+def set_thread_affinity(cores):
+    """Pin the calling thread to the given CPU cores (Linux only, best effort)"""
+    if not cores or not hasattr(os, 'sched_setaffinity'):
+        return
+    try:
+        os.sched_setaffinity(0, cores)
+    except OSError:
+        pass
+
+def raise_process_priority():
+    """Ask the OS to schedule this process ahead of background work (best effort)"""
+    try:
+        if os.name == 'nt':
+            import psutil
+            psutil.Process().nice(psutil.HIGH_PRIORITY_CLASS)
+        else:
+            os.nice(-5)
+    except Exception:
+        pass  # Needs psutil on Windows and elevated rights on Linux
+
+def split_cpu_cores():
+    """Return (camera cores, inference cores): one core for capture, the rest for inference"""
+    if not hasattr(os, 'sched_getaffinity'):
+        return None, None
+    cores = sorted(os.sched_getaffinity(0))
+    if len(cores) < 2:
+        return None, None
+    return {cores[0]}, set(cores[1:])
+
+# Report categories a step name can fall into (bit flags - a name may match several)
+CAT_CALIBRATION = 1
+CAT_DETECTION = 2
+CAT_SEQUENCE = 4
+_CATEGORY_KEYWORDS = (('calibration', CAT_CALIBRATION), ('detection', CAT_DETECTION),
+                      ('gaze', CAT_DETECTION), ('sequence', CAT_SEQUENCE))
+
+@lru_cache(maxsize=None)
+def step_category(name):
+    """Classify a step name once; step names repeat across retries and runs"""
+    name = name.lower()
+    category = 0
+    for keyword, flag in _CATEGORY_KEYWORDS:
+        if keyword in name:
+            category |= flag
+    return category
+
+class StepResult:
+    """Outcome of one test step; converted to a dict only for the JSON report"""
+    __slots__ = ('step', 'name', 'success', 'duration', 'detections', 'data', 'baseline')
+    
+    def __init__(self, step, name, success, duration, detections=None, data=None, baseline=None):
+        self.step = step
+        self.name = name
+        self.success = success
+        self.duration = duration
+        self.detections = detections
+        self.data = data
+        self.baseline = baseline
+    
+    def to_dict(self):
+        result = {'step': self.step, 'name': self.name, 'success': self.success, 'duration': self.duration}
+        for key in ('detections', 'data', 'baseline'):
+            value = getattr(self, key)
+            if value is not None:
+                result[key] = value
+        return result
+
+class VideoCaptureThreading:
+    """cv2.VideoCapture wrapper that reads frames on a background thread.
+
+    Only the newest frame is kept, so read() never blocks on the camera and
+    callers never see a backlog of stale frames. Frames are decoded into a
+    small ring of preallocated buffers, so a returned frame stays valid
+    until the reader has wrapped around the ring.
+    """
+    
+    def __init__(self, src=0, api=cv2.CAP_ANY, cpu_cores=None):
+        self.cap = cv2.VideoCapture(src, api)
+        self.cpu_cores = cpu_cores
+        self.grabbed, self.frame = False, None
+        self.frame_id = 0
+        self.ring = None  # Sized from the first frame the camera delivers
+        self.started = False
+        self.read_lock = threading.Lock()
+        self.thread = None
+    
+    def isOpened(self):
+        return self.cap.isOpened()
+    
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+    
+    def start(self):
+        """Start the reader thread"""
+        if self.started:
+            return self
+        self.started = True
+        self.thread = threading.Thread(target=self._reader, daemon=True)
+        self.thread.start()
+        return self
+    
+    def _reader(self):
+        set_thread_affinity(self.cpu_cores)
+        slot = 0
+        while self.started:
+            grabbed, frame = self.cap.read(self.ring[slot] if self.ring else None)
+            if grabbed and self.ring is None:
+                self.ring = [frame] + [np.empty_like(frame) for _ in range(CAPTURE_RING_SIZE - 1)]
+            with self.read_lock:
+                self.grabbed, self.frame = grabbed, frame
+                if grabbed:
+                    self.frame_id += 1
+            if self.ring:
+                slot = (slot + 1) % len(self.ring)
+    
+    def read(self):
+        """Return the latest (grabbed, frame) pair without blocking"""
+        with self.read_lock:
+            return self.grabbed, self.frame
+    
+    def read_latest(self):
+        """Return (grabbed, frame, frame_id); frame_id changes with every new frame"""
+        with self.read_lock:
+            return self.grabbed, self.frame, self.frame_id
+    
+    def stop(self):
+        """Stop the reader thread"""
+        self.started = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+    
+    def release(self):
+        self.stop()
+        self.cap.release()
+
+class FfmpegSink:
+    """Video writer that pipes raw BGR frames into an ffmpeg process.
+    
+    Encoding runs inside ffmpeg (on a hardware encoder when one works), and
+    frames reach it through a small queue drained by a background thread, so
+    write() never blocks the caller. Frames are dropped if the queue is full.
+    """
+    
+    # Tried in order; the first one that encodes a test frame is used
+    ENCODERS = [
+        ['-c:v', 'h264_nvenc', '-preset', 'p1'],
+        ['-c:v', 'h264_qsv'],
+        ['-c:v', 'h264_v4l2m2m'],
+        ['-c:v', 'libx264', '-preset', 'ultrafast', '-tune', 'zerolatency'],
+    ]
+    _encoder = None  # Cached probe result, shared by all sinks
+    
+    @staticmethod
+    def available():
+        return shutil.which('ffmpeg') is not None
+    
+    @classmethod
+    def pick_encoder(cls):
+        """Return the first encoder ffmpeg can actually use on this machine"""
+        if cls._encoder is None:
+            cls._encoder = cls.ENCODERS[-1]
+            for encoder in cls.ENCODERS:
+                probe = ['ffmpeg', '-hide_banner', '-loglevel', 'error',
+                         '-f', 'lavfi', '-i', 'color=size=256x256:duration=0.1',
+                         '-frames:v', '1', *encoder, '-pix_fmt', 'yuv420p', '-f', 'null', '-']
+                try:
+                    if subprocess.run(probe, capture_output=True, timeout=10).returncode == 0:
+                        cls._encoder = encoder
+                        break
+                except (OSError, subprocess.TimeoutExpired):
+                    continue
+        return cls._encoder
+    
+    def __init__(self, path, size, fps):
+        w, h = size
+        cmd = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+               '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{w}x{h}', '-r', str(fps), '-i', '-',
+               *self.pick_encoder(), '-pix_fmt', 'yuv420p', str(path)]
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        self.frames = queue.Queue(maxsize=4)
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+        self.thread.start()
+    
+    def isOpened(self):
+        return self.proc.poll() is None
+    
+    def write(self, frame):
+        try:
+            self.frames.put_nowait(frame)
+        except queue.Full:
+            pass  # Encoder is behind - drop the frame rather than stall
+    
+    def _drain(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            try:
+                self.proc.stdin.write(frame.data)  # Straight from the frame buffer, no copy
+            except (BrokenPipeError, OSError):
+                break
+    
+    def release(self):
+        self.frames.put(None)
+        self.thread.join(timeout=5)
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+def open_video_writer(path, fps, frame_size):
+    """cv2.VideoWriter on hardware-accelerated H.264 when OpenCV can, else mp4v"""
+    if hasattr(cv2, 'VIDEOWRITER_PROP_HW_ACCELERATION'):  # OpenCV 4.5.2+
+        try:
+            writer = cv2.VideoWriter(path, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*'avc1'), fps, frame_size,
+                                     [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+            if writer.isOpened():
+                return writer
+            writer.release()
+        except cv2.error:
+            pass
+    return cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, frame_size)
+
+
 class RemoteGazeTester:
+    # Key face points drawn on the analysis frame
+    KEY_POINTS = (10, 151, 9, 8, 168, 6, 197, 195, 5, 4, 1, 19, 94, 125)
+    
+    # Fixed narration rendered to WAV once at startup (step instructions are added too)
+    TTS_PROMPTS = [
+        "Starting remote gaze testing. Please follow the instructions carefully.",
+        "Starting calibration. Look at the center of the screen for 5 seconds.",
+        "Calibration complete",
+        "Calibration failed, please try again",
+        "Calibration error occurred",
+        "Step passed",
+        "Recording started",
+        "Recording stopped",
+        "Test reset. Starting calibration in 2 seconds.",
+    ]
+    
+    # Spoken lines that make anything still waiting in the TTS queue obsolete
+    TTS_FLUSH_PREFIXES = ("Test complete", "Test reset")
+    
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Remote Gaze Testing Interface")
         self.root.geometry("1200x800")
         
+        # (second, "HH:MM:SS") - log lines within the same second reuse the string
+        self._ts_cache = (0, "")
+        
+        # Log lines waiting to be written to the results box (flushed every 100 ms)
+        self._log_buf = deque()
+        self._log_pending = False
+        
         # Initialize components using existing logic
         self.gaze_detector = GazeDetector()
+        scale_detector_to_rate(self.gaze_detector, INFER_HZ)  # Updated at INFER_HZ, not camera rate
         self.face_landmarks = FaceLandmarks()
         
-        # MediaPipe Face Mesh (same as main.py)
+        self._landmarker = self._create_landmarker()
+        self._landmarker_ts = 0
+        
+        # MediaPipe Face Mesh (same as main.py) - only needed when the Tasks
+        # FaceLandmarker is unavailable
         self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            static_image_mode=False,
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        self.face_mesh = None
+        if self._landmarker is None:
+            self.face_mesh = self.mp_face_mesh.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=1,
+                refine_landmarks=True,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
         
         # Test state
         self.current_step = 0
@@ -83,6 +463,42 @@ class RemoteGazeTester:
         self.recording = False
         self.raw_writer = None
         self.analysis_writer = None
+        self._write_q = None  # (raw, analysis) pairs for the VideoWriter thread
+        self._writer_thread = None
+        
+        # Reused half-resolution buffers for MediaPipe (landmarks are normalized,
+        # so detecting on 320x240 doesn't change the metrics)
+        self._small = np.empty((240, 320, 3), np.uint8)
+        self._rgb_buf = np.empty_like(self._small)
+        self._display_buf = np.empty((360, 480, 3), np.uint8)
+        self._pil = None     # Persistent preview image, created with the first preview frame
+        self._tk_img = None
+        
+        # Preallocated calibration samples
+        self._calib_buf = np.empty(256, np.float32)
+        self._calib_count = 0
+        self._calib_collecting = False
+        self._calib_end = 0.0
+        self._calib_next_display = 0.0
+        
+        # Inference worker: the camera thread captures, _infer_loop runs FaceMesh,
+        # and update_camera only draws/records from the latest published result
+        self._frame_lock = threading.Lock()
+        self._result_lock = threading.Lock()
+        self._latest_frame = None
+        self._latest_result = None  # (landmark_xy, avg_pupil_y, pupil_relative, gaze_result)
+        self._result_seq = 0
+        self._shown_seq = 0
+        self._infer_running = False
+        self._infer_thread = None
+        self._infer_cores = None
+        self._last_infer_t = 0.0
+        self._last_frame_id = 0
+        
+        # Flipped frames and overlay frames, allocated on the first camera frame
+        self._frame_ring = None
+        self._overlay_ring = None
+        self._ring_slot = 0
         
         # Test results
         self.test_results = []
@@ -90,17 +506,30 @@ class RemoteGazeTester:
         self.session_start_time = time.time()
         self.step_retry_count = 0
         self.max_retries = 2
+        self.step_data = None
+        
+        # Calibration overlay state
+        self.calibrating = False
+        self.calibration_remaining = None
         
         # TTS
         if TTS_AVAILABLE:
             self.tts_engine = pyttsx3.init()
             self.tts_engine.setProperty('rate', 150)  # Slower speech
-            self.tts_queue = []
-            self.tts_speaking = False
         else:
             self.tts_engine = None
-            self.tts_queue = []
-            self.tts_speaking = False
+        self.tts_queue = deque()
+        self._tts_cond = threading.Condition()
+        self._tts_running = False
+        
+        self._tts_cache = {}  # Filled by the TTS worker once the prompts are rendered
+        self._tts_playing = None  # simpleaudio PlayObject of the clip being played
+        
+        if self.tts_engine:
+            # One long-lived thread owns the engine (cache rendering and say/runAndWait)
+            # and plays every prompt, cached or spoken, one at a time
+            self._tts_running = True
+            threading.Thread(target=self._tts_worker, daemon=True).start()
         
         self.setup_ui()
         self.start_camera()
@@ -215,14 +644,37 @@ class RemoteGazeTester:
     def start_camera(self):
         """Initialize camera using same logic as main.py"""
         try:
-            self.cap = cv2.VideoCapture(self.camera_index)
+            # Keep capture and inference on separate cores to cut scheduling jitter
+            camera_cores, self._infer_cores = split_cpu_cores()
+            raise_process_priority()
+            
+            self.cap = VideoCaptureThreading(self.camera_index, CAPTURE_API, camera_cores)
             if not self.cap.isOpened():
+                # Fall back to OpenCV's default backend; release the failed handle
+                # first, or the device can stay claimed (MSMF on Windows)
+                self.cap.release()
+                self.cap = VideoCaptureThreading(self.camera_index, cpu_cores=camera_cores)
+            if not self.cap.isOpened():
+                self.cap.release()
+                self.cap = None
                 raise Exception("Could not open camera")
             
+            # Ask for MJPG so the camera sends compressed frames over USB
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            
             # Set camera properties (same as main.py)
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
             self.cap.set(cv2.CAP_PROP_FPS, 30)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Don't queue stale frames in the driver
+            
+            # Read frames on a background thread so the Tk loop never blocks on the camera
+            self.cap.start()
+            
+            # Run MediaPipe off the Tk thread
+            self._infer_running = True
+            self._infer_thread = threading.Thread(target=self._infer_loop, daemon=True)
+            self._infer_thread.start()
             
             self.update_camera()
             self.log_result("✅ Camera initialized successfully")
@@ -236,49 +688,56 @@ class RemoteGazeTester:
         if self.cap is None:
             return
         
-        ret, frame = self.cap.read()
-        if not ret:
-            self.root.after(33, self.update_camera)  # ~30 FPS
+        ret, frame, frame_id = self.cap.read_latest()
+        if not ret or frame_id == self._last_frame_id:
+            # No new camera frame yet - check again on the next UI tick
+            self.root.after(UI_INTERVAL_MS, self.update_camera)
             return
+        self._last_frame_id = frame_id
+        
+        if self._frame_ring is None or self._frame_ring[0].shape != frame.shape:
+            self._frame_ring = [np.empty_like(frame) for _ in range(FRAME_RING_SIZE)]
+            self._overlay_ring = [np.empty_like(frame) for _ in range(FRAME_RING_SIZE)]
+        slot = self._ring_slot
+        self._ring_slot = (slot + 1) % FRAME_RING_SIZE
         
         # Flip frame horizontally for mirror effect
-        frame = cv2.flip(frame, 1)
+        frame = cv2.flip(frame, 1, dst=self._frame_ring[slot])
         h, w = frame.shape[:2]
         
-        # Create analysis frame (copy for overlay)
-        analysis_frame = frame.copy()
+        # Hand the newest frame to the inference thread
+        with self._frame_lock:
+            self._latest_frame = frame
+        
+        # Overlays go on a copy shared by the analysis recording and the preview;
+        # skip the copy and the drawing when neither is active
+        analysis_frame = None
+        if self._needs_overlay():
+            analysis_frame = self._overlay_ring[slot]
+            np.copyto(analysis_frame, frame)
         
-        # Process with MediaPipe (same as main.py)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
+        # Use the latest inference result; only a new one counts as a detection
+        with self._result_lock:
+            latest = self._latest_result
+            seq = self._result_seq
         
         gaze_result = None
         avg_pupil_y = None  # Initialize variable
-        if results.multi_face_landmarks:
-            landmarks = results.multi_face_landmarks[0]
-            
-            # Get gaze metrics (same as main.py)
-            avg_pupil_y, forehead_y, chin_y, pupil_relative, is_blinking = self.face_landmarks.get_gaze_metrics(landmarks, w, h)
-            
+        landmark_xy = None
+        if latest is not None:
+            landmark_xy, avg_pupil_y, _, gaze_result = latest
+        
+        if analysis_frame is not None:
             # Draw face landmarks on analysis frame
-            self.draw_face_landmarks(analysis_frame, landmarks, w, h)
+            if landmark_xy is not None:
+                self.draw_face_landmarks(analysis_frame, landmark_xy, w, h)
             
-            # Process with gaze detector
-            gaze_result = self.gaze_detector.update(pupil_relative, head_moving=False, is_blinking=is_blinking)
+            # Draw gaze analysis overlay
+            self.draw_gaze_overlay(analysis_frame, gaze_result, avg_pupil_y, w, h)
             
-        # Draw gaze analysis overlay
-        self.draw_gaze_overlay(analysis_frame, gaze_result, avg_pupil_y, w, h)
-        
-        # Draw calibration overlay if calibrating
-        if hasattr(self, 'calibrating') and self.calibrating:
-            self.draw_calibration_overlay(analysis_frame, w, h)
-            # Also update instruction display for calibration with visual red dot
-            if hasattr(self, 'calibration_remaining'):
-                calib_text = f"🔴 CALIBRATION 🔴\n\nLook at the RED DOT below\n\nTime remaining: {self.calibration_remaining:.1f} seconds\n\n\n\n\n\n        🔴\n\n\n\n\n"
-                self.instruction_display.config(text=calib_text, fg="red", bg="yellow", font=("Arial", 16, "bold"))
-            else:
-                calib_text = f"🔴 CALIBRATION 🔴\n\nLook at the RED DOT below\n\nStarting in 3 seconds...\n\n\n\n\n\n        🔴\n\n\n\n\n"
-                self.instruction_display.config(text=calib_text, fg="red", bg="yellow", font=("Arial", 16, "bold"))
+            # Draw calibration overlay if calibrating
+            if self.calibrating:
+                self.draw_calibration_overlay(analysis_frame, w, h)
         
         # Update detection label
         if gaze_result:
@@ -287,90 +746,189 @@ class RemoteGazeTester:
             continuous_text = " (CONTINUOUS)" if is_continuous else ""
             self.detection_label.config(text=f"Current Gaze: {direction}{continuous_text}")
         
-        # Process current test step
-        self.process_test_step(gaze_result)
+        # Process current test step (progress/timeouts still tick without a new result)
+        is_new_result = seq != self._shown_seq
+        self._shown_seq = seq
+        self.process_test_step(gaze_result if is_new_result else None)
         
         # Record frames if recording
         if self.recording:
-            if self.raw_writer:
-                self.raw_writer.write(frame)
-            if self.analysis_writer:
-                self.analysis_writer.write(analysis_frame)
-        
-        # Convert to PhotoImage and display
-        display_frame = cv2.cvtColor(analysis_frame, cv2.COLOR_BGR2RGB)
-        display_frame = cv2.resize(display_frame, (480, 360))  # Resize for display
-        
-        from PIL import Image, ImageTk
-        image = Image.fromarray(display_frame)
-        photo = ImageTk.PhotoImage(image)
+            if self._write_q is not None:
+                try:
+                    self._write_q.put_nowait((frame, analysis_frame))
+                except queue.Full:
+                    pass  # Writer is behind - drop the frame rather than stall
+            else:
+                if self.raw_writer:
+                    self.raw_writer.write(frame)
+                if self.analysis_writer and analysis_frame is not None:
+                    self.analysis_writer.write(analysis_frame)
         
         # Camera display is hidden - only record in background
-        # self.camera_label.configure(image=photo)  # Hidden
-        # self.camera_label.image = photo  # Keep a reference
+        if self.camera_label is not None and PIL_AVAILABLE and analysis_frame is not None:
+            # Convert to PhotoImage and display
+            cv2.resize(analysis_frame, (480, 360), dst=self._display_buf)  # Resize for display
+            cv2.cvtColor(self._display_buf, cv2.COLOR_BGR2RGB, dst=self._display_buf)
+            if self._tk_img is None:
+                self._pil = Image.new('RGB', (480, 360))
+                self._tk_img = ImageTk.PhotoImage(self._pil)
+                self.camera_label.configure(image=self._tk_img)
+                self.camera_label.image = self._tk_img  # Keep a reference
+            
+            # Reuse the same PIL/Tk images every frame
+            self._pil.frombytes(self._display_buf.tobytes())
+            self._tk_img.paste(self._pil)
         
         # Schedule next update
-        self.root.after(33, self.update_camera)  # ~30 FPS
+        self.root.after(UI_INTERVAL_MS, self.update_camera)
+    
+    def _infer_loop(self):
+        """Worker thread: run FaceMesh and the gaze detector on the newest frame"""
+        set_thread_affinity(self._infer_cores)
+        while self._infer_running:
+            # Pace inference at INFER_HZ; the UI keeps drawing the last result meanwhile
+            wait = self._last_infer_t + 1.0 / INFER_HZ - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            
+            with self._frame_lock:
+                frame = self._latest_frame
+                self._latest_frame = None
+            
+            if frame is None:
+                time.sleep(0.005)
+                continue
+            
+            self._last_infer_t = time.perf_counter()
+            h, w = frame.shape[:2]
+            
+            # Process with MediaPipe at half resolution into the preallocated buffers
+            cv2.resize(frame, (320, 240), dst=self._small, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(self._small, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+            landmarks = self._detect_landmarks()
+            
+            landmark_xy = None
+            avg_pupil_y = None
+            pupil_relative = None
+            gaze_result = None
+            if landmarks is not None:
+                if self._needs_overlay():
+                    # Normalized (x, y) of just the KEY_POINTS the overlay draws
+                    points = landmarks.landmark
+                    n = len(points)
+                    landmark_xy = np.array([(points[i].x, points[i].y) for i in self.KEY_POINTS if i < n],
+                                           dtype=np.float32).reshape(-1, 2)
+                
+                # Get gaze metrics (same as main.py)
+                avg_pupil_y, forehead_y, chin_y, pupil_relative, is_blinking = self.face_landmarks.get_gaze_metrics(landmarks, w, h)
+                
+                # Process with gaze detector
+                gaze_result = self.gaze_detector.update(pupil_relative, head_moving=False, is_blinking=is_blinking)
+            
+            with self._result_lock:
+                self._latest_result = (landmark_xy, avg_pupil_y, pupil_relative, gaze_result)
+                self._result_seq += 1
+                
+                # Feed calibration from the same results
+                if self._calib_collecting and pupil_relative is not None and self._calib_count < len(self._calib_buf):
+                    self._calib_buf[self._calib_count] = pupil_relative
+                    self._calib_count += 1
+    
+    def _needs_overlay(self):
+        """Whether an analysis frame is drawn (recording it or showing it in the window)"""
+        return bool(self.recording and self.analysis_writer) or self.camera_label is not None
     
-    def draw_face_landmarks(self, frame, landmarks, w, h):
+    def _create_landmarker(self):
+        """Create a Tasks FaceLandmarker (GPU, then CPU delegate), or None to use FaceMesh"""
+        if not USE_FACE_LANDMARKER or not FACE_LANDMARKER_MODEL.exists():
+            return None
+        
+        try:
+            from mediapipe.tasks.python import BaseOptions
+            from mediapipe.tasks.python.vision import FaceLandmarker, FaceLandmarkerOptions, RunningMode
+        except ImportError:
+            print("⚠️ MediaPipe Tasks not available. Using FaceMesh.")
+            return None
+        
+        for delegate in (BaseOptions.Delegate.GPU, BaseOptions.Delegate.CPU):
+            try:
+                options = FaceLandmarkerOptions(
+                    base_options=BaseOptions(model_asset_path=str(FACE_LANDMARKER_MODEL), delegate=delegate),
+                    running_mode=RunningMode.VIDEO,
+                    num_faces=1
+                )
+                landmarker = FaceLandmarker.create_from_options(options)
+                print(f"✅ FaceLandmarker using {delegate.name} delegate")
+                return landmarker
+            except Exception as e:
+                print(f"⚠️ FaceLandmarker {delegate.name} delegate unavailable: {e}")
+        
+        return None
+    
+    def _detect_landmarks(self):
+        """Run landmark detection on self._rgb_buf; returns an object with .landmark, or None"""
+        if self._landmarker is not None:
+            # VIDEO mode needs strictly increasing timestamps
+            self._landmarker_ts = max(int(time.monotonic() * 1000), self._landmarker_ts + 1)
+            image = mp.Image(image_format=mp.ImageFormat.SRGB, data=self._rgb_buf)
+            result = self._landmarker.detect_for_video(image, self._landmarker_ts)
+            if result.face_landmarks:
+                # Same shape as a FaceMesh result so get_gaze_metrics is unchanged
+                return SimpleNamespace(landmark=result.face_landmarks[0])
+            return None
+        
+        results = self.face_mesh.process(self._rgb_buf)
+        if results.multi_face_landmarks:
+            return results.multi_face_landmarks[0]
+        return None
+    
+    def draw_face_landmarks(self, frame, landmark_xy, w, h):
         """Draw face landmarks on analysis frame"""
-        # Draw key face landmarks as small blue dots
-        key_points = [10, 151, 9, 8, 168, 6, 197, 195, 5, 4, 1, 19, 94, 125]  # Key face points
+        # Draw key face landmarks (landmark_xy holds only KEY_POINTS) as small blue dots
+        xy = (landmark_xy * (w, h)).astype(np.int32)
         
-        for point_idx in key_points:
-            if point_idx < len(landmarks.landmark):
-                point = landmarks.landmark[point_idx]
-                x = int(point.x * w)
-                y = int(point.y * h)
-                cv2.circle(frame, (x, y), 2, (255, 0, 0), -1)  # Blue dots
+        for x, y in xy.tolist():
+            cv2.circle(frame, (x, y), 2, (255, 0, 0), -1)  # Blue dots
     
     def draw_gaze_overlay(self, frame, gaze_result, pupil_y, w, h):
         """Draw gaze analysis overlay on frame"""
         if not gaze_result:
             return
         
+        direction = gaze_result.get('direction')
+        is_continuous = gaze_result.get('is_continuous_gaze', False)
+        offset = gaze_result.get('offset', 0)
+        baseline = self.gaze_detector.baseline_y
+        
         # Draw pupil position as red dot
         pupil_x = w // 2  # Approximate center
         pupil_screen_y = int(pupil_y) if pupil_y else h // 2
         cv2.circle(frame, (pupil_x, pupil_screen_y), 5, (0, 0, 255), -1)  # Red pupil dot
         
         # Draw baseline if available
-        if self.gaze_detector.baseline_y is not None:
-            baseline_screen_y = int(self.gaze_detector.baseline_y * h) if self.gaze_detector.baseline_y < 1 else int(self.gaze_detector.baseline_y)
+        if baseline is not None:
+            baseline_screen_y = int(baseline * h) if baseline < 1 else int(baseline)
             cv2.line(frame, (50, baseline_screen_y), (w-50, baseline_screen_y), (0, 255, 255), 2)  # Yellow baseline
-            cv2.putText(frame, "BASELINE", (60, baseline_screen_y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+            cv2.putText(frame, "BASELINE", (60, baseline_screen_y-10), _FONT, 0.5, (0, 255, 255), 1)
         
         # Draw gaze direction arrow
-        direction = gaze_result.get('direction')
         if direction:
             center_x, center_y = w // 2, h // 2
-            arrow_length = 50
-            
-            if direction == "UP":
-                end_point = (center_x, center_y - arrow_length)
-                color = (0, 255, 0)  # Green
-            elif direction == "DOWN":
-                end_point = (center_x, center_y + arrow_length)
-                color = (0, 0, 255)  # Red
-            else:
-                end_point = (center_x, center_y)
-                color = (128, 128, 128)  # Gray
-            
-            cv2.arrowedLine(frame, (center_x, center_y), end_point, color, 3, tipLength=0.3)
+            dx, dy, color = _ARROW_TABLE.get(direction, _ARROW_DEFAULT)
+            cv2.arrowedLine(frame, (center_x, center_y), (center_x + dx, center_y + dy), color, 3, tipLength=0.3)
         
         # Draw status text
         status_text = f"Gaze: {direction or 'NEUTRAL'}"
-        if gaze_result.get('is_continuous_gaze', False):
+        if is_continuous:
             status_text += " (CONTINUOUS)"
         
-        cv2.putText(frame, status_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        cv2.putText(frame, status_text, (10, 30), _FONT, 0.7, (255, 255, 255), 2)
         
         # Draw confidence bar
-        offset = gaze_result.get('offset', 0)
         confidence = min(100, abs(offset) * 1000)  # Convert to percentage
         bar_width = int(confidence * 2)  # Scale for display
         cv2.rectangle(frame, (10, h-30), (10 + bar_width, h-10), (0, 255, 0), -1)
-        cv2.putText(frame, f"Confidence: {confidence:.0f}%", (10, h-35), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        cv2.putText(frame, f"Confidence: {confidence:.0f}%", (10, h-35), _FONT, 0.5, (255, 255, 255), 1)
     
     def draw_calibration_overlay(self, frame, w, h):
         """Draw prominent calibration overlay"""
@@ -381,45 +939,106 @@ class RemoteGazeTester:
         
         # Draw calibration text
         cv2.putText(frame, "CALIBRATION", (center_x - 100, center_y - 60), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3, cv2.LINE_AA)
+                   _FONT, 1.5, (0, 0, 255), 3, _LINE_AA)
         cv2.putText(frame, "Look at RED DOT", (center_x - 120, center_y + 80), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
+                   _FONT, 1, (255, 255, 255), 2, _LINE_AA)
         
         # Draw countdown if available
-        if hasattr(self, 'calibration_remaining'):
+        if self.calibration_remaining is not None:
             cv2.putText(frame, f"{self.calibration_remaining:.1f}s", (center_x - 30, center_y + 120), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2, cv2.LINE_AA)
+                       _FONT, 1.2, (0, 255, 255), 2, _LINE_AA)
+    
+    def _build_tts_cache(self):
+        """Render the fixed prompts to WAV files (reused across runs)"""
+        if not self.tts_engine or not (SIMPLEAUDIO_AVAILABLE or WINSOUND_AVAILABLE):
+            return
+        
+        prompts = list(self.TTS_PROMPTS)
+        prompts += [step['instruction'] for step in self.test_steps]
+        prompts += [f"Step failed. Retrying attempt {i} of {self.max_retries}" for i in range(1, self.max_retries + 1)]
+        prompts.append(f"Step failed after {self.max_retries} attempts. Moving to next step.")
+        
+        try:
+            TTS_CACHE_DIR.mkdir(exist_ok=True)
+            paths = {}
+            missing = False
+            for text in dict.fromkeys(prompts):
+                # hash() is salted per process, so use a stable digest for file names
+                path = TTS_CACHE_DIR / f"{hashlib.md5(text.encode('utf-8')).hexdigest()}.wav"
+                if not path.exists():
+                    self.tts_engine.save_to_file(text, str(path))
+                    missing = True
+                paths[text] = path
+            if missing:
+                self.tts_engine.runAndWait()
+            self._tts_cache = {text: str(path) for text, path in paths.items() if path.exists()}
+        except Exception as e:
+            print(f"TTS cache error: {e}")
+    
+    def _play_cached(self, path):
+        """Play a pre-rendered prompt and wait for it to finish (TTS worker only)"""
+        if SIMPLEAUDIO_AVAILABLE:
+            self._tts_playing = simpleaudio.WaveObject.from_wave_file(path).play()
+            try:
+                self._tts_playing.wait_done()
+            finally:
+                self._tts_playing = None
+        else:
+            winsound.PlaySound(path, winsound.SND_FILENAME)
+    
+    def _stop_cached(self):
+        """Cut off the prompt clip that is playing, if any"""
+        try:
+            if SIMPLEAUDIO_AVAILABLE:
+                playing = self._tts_playing
+                if playing is not None:
+                    playing.stop()
+            elif WINSOUND_AVAILABLE:
+                winsound.PlaySound(None, 0)  # None stops the current sound
+        except Exception as e:
+            print(f"TTS playback error: {e}")
     
     def speak(self, text):
         """Text-to-speech narration with queue system"""
-        if self.tts_engine:
-            # Add to queue
-            self.tts_queue.append(text)
-            self._process_tts_queue()
+        if self._tts_running:
+            with self._tts_cond:
+                if text.startswith(self.TTS_FLUSH_PREFIXES):
+                    self.tts_queue.clear()
+                    self._stop_cached()
+                # Back-to-back repeats are only spoken once
+                if not self.tts_queue or self.tts_queue[-1] != text:
+                    self.tts_queue.append(text)
+                    self._tts_cond.notify()
         
         # Also log to results
         self.log_result(f"🔊 {text}")
     
-    def _process_tts_queue(self):
-        """Process TTS queue to prevent overlapping speech"""
-        if not self.tts_engine or self.tts_speaking or not self.tts_queue:
-            return
-        
-        self.tts_speaking = True
-        text = self.tts_queue.pop(0)
-        
-        def speak_thread():
+    def _tts_worker(self):
+        """Speak queued lines one at a time so speech never overlaps"""
+        # Render the prompt cache here, not in __init__, so the window isn't held up
+        self._build_tts_cache()
+        
+        while True:
+            with self._tts_cond:
+                while self._tts_running and not self.tts_queue:
+                    self._tts_cond.wait()
+                if not self._tts_running:
+                    return
+                text = self.tts_queue.popleft()
+            
+            path = self._tts_cache.get(text)
+            if path:
+                try:
+                    self._play_cached(path)
+                    continue
+                except Exception as e:
+                    print(f"TTS playback error: {e}")
+            
             try:
                 self.tts_engine.say(text)
                 self.tts_engine.runAndWait()
             except Exception as e:
                 print(f"TTS Error: {e}")
-            finally:
-                self.tts_speaking = False
-                # Process next item in queue
-                self.root.after(100, self._process_tts_queue)
-        
-        threading.Thread(target=speak_thread, daemon=True).start()
     
     def start_test(self):
         """Start the testing sequence"""
@@ -462,93 +1081,121 @@ class RemoteGazeTester:
         else:
             self.root.after(3000, lambda: self.execute_gaze_step(step))  # 3 second delay
     
+    def _show_calibration_text(self, remaining):
+        """Update instruction display for calibration with visual red dot (UI thread)"""
+        if remaining is not None:
+            calib_text = f"🔴 CALIBRATION 🔴\n\nLook at the RED DOT below\n\nTime remaining: {remaining:.1f} seconds\n\n\n\n\n\n        🔴\n\n\n\n\n"
+        else:
+            calib_text = f"🔴 CALIBRATION 🔴\n\nLook at the RED DOT below\n\nStarting in 3 seconds...\n\n\n\n\n\n        🔴\n\n\n\n\n"
+        self.instruction_display.config(text=calib_text, fg="red", bg="yellow", font=("Arial", 16, "bold"))
+    
     def execute_calibration_step(self):
-        """Execute calibration step using our own camera feed"""
-        def calibration_thread():
-            try:
-                self.log_result("🎯 Starting calibration...")
-                self.speak("Starting calibration. Look at the center of the screen for 5 seconds.")
-                
-                # Set calibrating flag for visual overlay
-                self.calibrating = True
-                
-                # Use our own camera feed for calibration
-                calibration_frames = []
-                calibration_duration = 5.0  # 5 seconds
-                calibration_start_time = time.time()
-                
-                # Show calibration instructions
-                self.log_result("CALIBRATION: Look at center of screen for 5 seconds...")
+        """Execute calibration step using samples from the inference thread"""
+        try:
+            self.log_result("🎯 Starting calibration...")
+            self.speak("Starting calibration. Look at the center of the screen for 5 seconds.")
+            
+            # Set calibrating flag for visual overlay
+            self.calibration_remaining = None
+            self.calibrating = True
+            self._show_calibration_text(None)
+            
+            # The inference thread fills _calib_buf while collecting
+            calibration_duration = 5.0  # 5 seconds
+            with self._result_lock:
+                self._calib_count = 0
+                self._calib_collecting = True
+            self._calib_end = time.time() + calibration_duration
+            self._calib_next_display = 0.0
+            
+            # Show calibration instructions
+            self.log_result("CALIBRATION: Look at center of screen for 5 seconds...")
+            
+            self.root.after(100, self._tick_calib)
+            
+        except Exception as e:
+            self._calib_collecting = False
+            self.calibrating = False
+            self.log_result(f"❌ Calibration error: {e}")
+            self.speak("Calibration error occurred")
+    
+    def _tick_calib(self):
+        """Update the calibration countdown and finish once time is up"""
+        try:
+            remaining = self._calib_end - time.time()
+            if remaining > 0:
+                # Show countdown
+                self.calibration_remaining = remaining
                 
-                # Wait for calibration duration
-                while time.time() - calibration_start_time < calibration_duration:
-                    ret, frame = self.cap.read()
-                    if ret:
-                        # Process frame for calibration
-                        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        results = self.face_mesh.process(frame_rgb)
-                        
-                        if results.multi_face_landmarks:
-                            landmarks = results.multi_face_landmarks[0]
-                            h, w = frame.shape[:2]
-                            avg_pupil_y, forehead_y, chin_y, pupil_relative, is_blinking = self.face_landmarks.get_gaze_metrics(landmarks, w, h)
-                            if pupil_relative is not None:
-                                calibration_frames.append(pupil_relative)
-                        
-                        # Show countdown
-                        remaining = calibration_duration - (time.time() - calibration_start_time)
-                        self.calibration_remaining = remaining
-                        self.log_result(f"CALIBRATION: Look at center - {remaining:.1f}s remaining")
-                        
-                        time.sleep(0.1)
+                # Refresh the instruction text at 2 Hz
+                if time.time() >= self._calib_next_display:
+                    self._calib_next_display = time.time() + 0.5
+                    self._show_calibration_text(remaining)
                 
-                # Clear calibrating flag
-                self.calibrating = False
+                self.root.after(100, self._tick_calib)
+                return
+            
+            with self._result_lock:
+                self._calib_collecting = False
+                calibration_count = self._calib_count
+            
+            # Clear calibrating flag
+            self.calibrating = False
+            
+            # Calculate baseline from calibration data
+            if calibration_count:
+                baseline = float(running_mean(self._calib_buf, calibration_count))
+                self.gaze_detector.baseline_y = baseline
+                self.log_result(f"✅ Calibration complete! Baseline: {baseline:.3f} (from {calibration_count} frames)")
+                self.speak("Calibration complete")
                 
-                # Calculate baseline from calibration data
-                if calibration_frames:
-                    baseline = sum(calibration_frames) / len(calibration_frames)
-                    self.gaze_detector.baseline_y = baseline
-                    self.log_result(f"✅ Calibration complete! Baseline: {baseline:.3f} (from {len(calibration_frames)} frames)")
-                    self.speak("Calibration complete")
-                    
-                    # Record result
-                    self.test_results.append({
-                        'step': self.current_step,
-                        'name': self.test_steps[self.current_step]['name'],
-                        'success': True,
-                        'duration': time.time() - self.step_start_time,
-                        'baseline': baseline
-                    })
-                    
-                    # Automatically move to next step after calibration
-                    self.root.after(2000, self.next_step)
-                else:
-                    self.log_result("❌ Calibration failed - no valid frames captured")
-                    self.speak("Calibration failed, please try again")
+                # Record result
+                self.test_results.append(StepResult(
+                    step=self.current_step,
+                    name=self.test_steps[self.current_step]['name'],
+                    success=True,
+                    duration=time.time() - self.step_start_time,
+                    baseline=baseline
+                ))
                 
-            except Exception as e:
-                self.calibrating = False
-                self.log_result(f"❌ Calibration error: {e}")
-                self.speak("Calibration error occurred")
-        
-        threading.Thread(target=calibration_thread, daemon=True).start()
+                # Automatically move to next step after calibration
+                self.root.after(2000, self.next_step)
+            else:
+                self.log_result("❌ Calibration failed - no valid frames captured")
+                self.speak("Calibration failed, please try again")
+            
+        except Exception as e:
+            self._calib_collecting = False
+            self.calibrating = False
+            self.log_result(f"❌ Calibration error: {e}")
+            self.speak("Calibration error occurred")
     
     def execute_gaze_step(self, step):
         """Execute a gaze detection step"""
+        target_direction = step['type'].split('_')[0].upper() if '_' in step['type'] else 'NEUTRAL'
         self.step_data = {
             'step_type': step['type'],
-            'target_direction': step['type'].split('_')[0].upper() if '_' in step['type'] else 'NEUTRAL',
+            'target_direction': target_direction,
             'duration': step.get('duration', 3),
-            'detections': [],
-            'start_time': time.time()
+            'start_time': time.time(),
+            # Detections as parallel arrays plus running counters for analyze_step_results
+            'dir': np.empty(1024, np.int8),
+            'cont': np.empty(1024, np.bool_),
+            'offset': np.empty(1024, np.float32),
+            'n': 0,
+            'target': DIR_CODE.get(target_direction, DIR_NONE),
+            'target_hits': 0,
+            'cont_hits': 0,
+            'false_hits': 0,
+            'recent': [],
+            'pattern_found': False
         }
         
         self.log_result(f"🧪 Starting {step['name']} test...")
     
     def process_test_step(self, gaze_result):
         """Process gaze result for current test step"""
-        if self.current_step >= len(self.test_steps) or not hasattr(self, 'step_data'):
+        if self.current_step >= len(self.test_steps) or self.step_data is None:
             return
         
         current_time = time.time()
@@ -561,24 +1208,44 @@ class RemoteGazeTester:
             self.progress_var.set(progress)
         
         # Record gaze data
-        if gaze_result and hasattr(self, 'step_data'):
-            detection_data = {
-                'timestamp': current_time,
-                'elapsed': elapsed,
-                'direction': gaze_result.get('direction'),
-                'is_continuous': gaze_result.get('is_continuous_gaze', False),
-                'offset': gaze_result.get('offset', 0)
-            }
-            self.step_data['detections'].append(detection_data)
+        if gaze_result and self.step_data is not None:
+            step_data = self.step_data
+            n = step_data['n']
+            if n == len(step_data['dir']):
+                for key in ('dir', 'cont', 'offset'):
+                    step_data[key] = np.resize(step_data[key], 2 * n)
+            
+            code = DIR_CODE.get(gaze_result.get('direction'), DIR_NONE)
+            is_continuous = bool(gaze_result.get('is_continuous_gaze', False))
+            step_data['dir'][n] = code
+            step_data['cont'][n] = is_continuous
+            step_data['offset'][n] = gaze_result.get('offset') or 0.0
+            step_data['n'] = n + 1
+            
+            if code != DIR_NONE:
+                if code == step_data['target']:
+                    step_data['target_hits'] += 1
+                    if is_continuous:
+                        step_data['cont_hits'] += 1
+                if code != DIR_NEUTRAL:
+                    step_data['false_hits'] += 1
+                
+                # Track the last few directions for the sequence pattern
+                recent = step_data['recent']
+                recent.append(code)
+                if len(recent) > len(SEQUENCE_PATTERN):
+                    del recent[0]
+                if recent == SEQUENCE_PATTERN:
+                    step_data['pattern_found'] = True
         
         # Check step completion
-        if hasattr(self, 'step_data') and 'duration' in step:
+        if self.step_data is not None and 'duration' in step:
             if elapsed >= step['duration']:
                 self.complete_current_step()
     
     def complete_current_step(self):
         """Complete the current test step and analyze results"""
-        if not hasattr(self, 'step_data'):
+        if self.step_data is None:
             return
         
         step = self.test_steps[self.current_step]
@@ -588,14 +1255,15 @@ class RemoteGazeTester:
         success = self.analyze_step_results(step, self.step_data)
         
         # Record result
-        result = {
-            'step': self.current_step,
-            'name': step['name'],
-            'success': success,
-            'duration': duration,
-            'detections': len(self.step_data['detections']),
-            'data': self.step_data
-        }
+        result = StepResult(
+            step=self.current_step,
+            name=step['name'],
+            success=success,
+            duration=duration,
+            detections=self.step_data['n'],
+            # Detection arrays stay out of the JSON report; counters are kept
+            data={key: value for key, value in self.step_data.items() if not isinstance(value, np.ndarray)}
+        )
         self.test_results.append(result)
         
         # Update UI
@@ -613,7 +1281,7 @@ class RemoteGazeTester:
             self.instruction_display.config(text=retry_text, fg="white", bg="red")
             
             # Clean up step data and retry after 3 seconds
-            delattr(self, 'step_data')
+            self.step_data = None
             self.root.after(3000, self.execute_current_step)
         else:
             # Step passed or max retries reached
@@ -625,52 +1293,33 @@ class RemoteGazeTester:
                 self.step_retry_count = 0  # Reset retry count
             
             # Clean up step data
-            delattr(self, 'step_data')
+            self.step_data = None
             
             # Automatically move to next step after 2 seconds
             self.root.after(2000, self.next_step)
     
     def analyze_step_results(self, step, step_data):
         """Analyze step results to determine success"""
-        detections = step_data['detections']
-        if not detections:
+        if not step_data['n']:
             return False
         
         step_type = step['type']
-        target_direction = step_data['target_direction']
         
         if step_type in ['up_hold', 'down_hold']:
             # Check if target direction was detected and held
-            target_detections = [d for d in detections if d['direction'] == target_direction]
-            return len(target_detections) >= 3  # At least 3 detections
+            return step_data['target_hits'] >= 3  # At least 3 detections
         
         elif step_type in ['up_continuous', 'down_continuous']:
             # Check for continuous gaze detection
-            continuous_detections = [d for d in detections if d['is_continuous'] and d['direction'] == target_direction]
-            return len(continuous_detections) >= 5  # At least 5 continuous detections
+            return step_data['cont_hits'] >= 5  # At least 5 continuous detections
         
         elif step_type == 'neutral':
             # Check for minimal false detections
-            false_detections = [d for d in detections if d['direction'] in ['UP', 'DOWN']]
-            return len(false_detections) < 3  # Less than 3 false detections
+            return step_data['false_hits'] < 3  # Less than 3 false detections
         
         elif step_type == 'sequence':
             # Command sequence test - need UP, DOWN, UP, DOWN pattern
-            directions = [d['direction'] for d in detections if d['direction']]
-            if len(directions) < 4:
-                return False
-            
-            # Look for the pattern UP, DOWN, UP, DOWN
-            pattern_found = False
-            for i in range(len(directions) - 3):
-                if (directions[i] == 'UP' and 
-                    directions[i+1] == 'DOWN' and 
-                    directions[i+2] == 'UP' and 
-                    directions[i+3] == 'DOWN'):
-                    pattern_found = True
-                    break
-            
-            return pattern_found
+            return step_data['pattern_found']
         
         return True
     
@@ -686,8 +1335,9 @@ class RemoteGazeTester:
     def complete_test(self):
         """Complete the entire test and generate report"""
         total_duration = time.time() - self.session_start_time
-        passed_steps = sum(1 for result in self.test_results if result['success'])
-        success_rate = (passed_steps / len(self.test_results)) * 100 if self.test_results else 0
+        summary = self._summarize(self.test_results)
+        passed_steps = summary['passed']
+        success_rate = summary['success_rate']
         
         # Update UI
         self.step_label.config(text="Test Complete!")
@@ -698,24 +1348,51 @@ class RemoteGazeTester:
         self.next_button.config(state=tk.DISABLED)
         
         # Generate report
-        self.generate_report()
+        self.generate_report(summary)
         
         # Speak completion
         self.speak(f"Test complete. Success rate: {success_rate:.0f} percent")
         
         self.log_result(f"🎉 Test completed! Success rate: {success_rate:.1f}% in {total_duration:.1f}s")
     
-    def generate_report(self):
+    def _summarize(self, results):
+        """Collect the pass/fail and calibration figures used by the report in one pass"""
+        summary = {'total': len(results), 'passed': 0, 'calib_sum': 0.0, 'calib_n': 0,
+                   'detection_n': 0, 'failed_detections': 0, 'sequence_failed': None}
+        
+        for result in results:
+            category = step_category(result.name or '')
+            if result.success:
+                summary['passed'] += 1
+            if category & CAT_CALIBRATION:
+                summary['calib_sum'] += round(result.baseline, 3) if result.baseline is not None else 0
+                summary['calib_n'] += 1
+            if category & CAT_DETECTION:
+                summary['detection_n'] += 1
+                if not result.success:
+                    summary['failed_detections'] += 1
+            if category & CAT_SEQUENCE and summary['sequence_failed'] is None:
+                summary['sequence_failed'] = not result.success
+        
+        summary['success_rate'] = (summary['passed'] / summary['total']) * 100 if summary['total'] else 0
+        return summary
+    
+    def generate_report(self, summary=None):
         """Generate detailed test report"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if summary is None:
+            summary = self._summarize(self.test_results)
+        
+        # One clock read for the file name, the report date and the duration
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         report_file = f"gaze_test_report_{timestamp}.json"
         
         # Create readable step summary
         step_summary = []
         for i, result in enumerate(self.test_results):
-            step_name = result.get('name', f'Step {i+1}')
-            status = "✅ PASSED" if result.get('success', False) else "❌ FAILED"
-            duration = result.get('duration', 0)
+            step_name = result.name or f'Step {i+1}'
+            status = "✅ PASSED" if result.success else "❌ FAILED"
+            duration = result.duration or 0
             
             step_info = {
                 'step_number': i + 1,
@@ -725,60 +1402,56 @@ class RemoteGazeTester:
             }
             
             # Add specific metrics for different test types
-            if 'detections' in result:
-                step_info['detections_count'] = result['detections']
+            if result.detections is not None:
+                step_info['detections_count'] = result.detections
             
-            if 'baseline' in result:
-                step_info['calibration_baseline'] = round(result['baseline'], 3)
+            if result.baseline is not None:
+                step_info['calibration_baseline'] = round(result.baseline, 3)
             
             step_summary.append(step_info)
         
-        success_rate = (sum(1 for r in self.test_results if r['success']) / len(self.test_results)) * 100 if self.test_results else 0
+        success_rate = summary['success_rate']
         
         report = {
             'test_summary': {
-                'total_duration_minutes': round((time.time() - self.session_start_time) / 60, 1),
+                'total_duration_minutes': round((now.timestamp() - self.session_start_time) / 60, 1),
                 'total_steps': len(self.test_steps),
                 'completed_steps': len(self.test_results),
                 'success_rate_percent': round(success_rate, 1),
-                'test_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                'test_date': now.strftime("%Y-%m-%d %H:%M:%S")
             },
             'step_results': step_summary,
-            'detailed_results': self.test_results,
-            'recommendations': self._generate_recommendations(step_summary)
+            'detailed_results': [result.to_dict() for result in self.test_results],
+            'recommendations': self._generate_recommendations(summary)
         }
         
         try:
-            with open(report_file, 'w') as f:
-                json.dump(report, f, indent=2)
+            with open(report_file, 'wb') as f:
+                f.write(dump_json_bytes(report, indent=True))
             self.log_result(f"📊 Report saved: {report_file}")
         except Exception as e:
             self.log_result(f"❌ Could not save report: {e}")
     
-    def _generate_recommendations(self, step_summary):
-        """Generate recommendations based on test results"""
+    def _generate_recommendations(self, summary):
+        """Generate recommendations based on test results (see _summarize)"""
         recommendations = []
         
         # Check calibration quality
-        calib_steps = [s for s in step_summary if 'calibration' in s['name'].lower()]
-        if calib_steps:
-            avg_baseline = sum(s.get('calibration_baseline', 0) for s in calib_steps) / len(calib_steps)
+        if summary['calib_n']:
+            avg_baseline = summary['calib_sum'] / summary['calib_n']
             if avg_baseline < 0.2 or avg_baseline > 0.4:
                 recommendations.append("⚠️ Calibration baselines are outside optimal range (0.2-0.4). Consider better lighting or positioning.")
         
         # Check detection accuracy
-        detection_steps = [s for s in step_summary if 'detection' in s['name'].lower() or 'gaze' in s['name'].lower()]
-        failed_detections = [s for s in detection_steps if 'FAILED' in s['status']]
-        if len(failed_detections) > len(detection_steps) * 0.3:
+        if summary['failed_detections'] > summary['detection_n'] * 0.3:
             recommendations.append("⚠️ High failure rate in gaze detection. Consider adjusting gaze thresholds or improving lighting.")
         
         # Check sequence test
-        sequence_steps = [s for s in step_summary if 'sequence' in s['name'].lower()]
-        if sequence_steps and 'FAILED' in sequence_steps[0]['status']:
+        if summary['sequence_failed']:
             recommendations.append("⚠️ Command sequence test failed. This may indicate timing issues for rapid commands in your app.")
         
         # Overall success rate
-        success_rate = sum(1 for s in step_summary if 'PASSED' in s['status']) / len(step_summary) * 100
+        success_rate = summary['success_rate']
         if success_rate < 70:
             recommendations.append("⚠️ Overall success rate is low. Consider improving test conditions or gaze detection settings.")
         elif success_rate > 90:
@@ -798,20 +1471,30 @@ class RemoteGazeTester:
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
-            # Video codec and settings
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            # Video settings
             fps = 30
             frame_size = (640, 480)
-            
-            # Raw camera feed
             raw_filename = f"raw_camera_{timestamp}.mp4"
-            self.raw_writer = cv2.VideoWriter(raw_filename, fourcc, fps, frame_size)
-            
-            # Analysis feed with overlays
             analysis_filename = f"analysis_{timestamp}.mp4"
-            self.analysis_writer = cv2.VideoWriter(analysis_filename, fourcc, fps, frame_size)
+            
+            if FfmpegSink.available():
+                # Encode in ffmpeg so the camera loop only queues frames
+                self.raw_writer = FfmpegSink(raw_filename, frame_size, fps)
+                self.analysis_writer = FfmpegSink(analysis_filename, frame_size, fps)
+            else:
+                self.raw_writer = open_video_writer(raw_filename, fps, frame_size)
+                self.analysis_writer = open_video_writer(analysis_filename, fps, frame_size)
             
             if self.raw_writer.isOpened() and self.analysis_writer.isOpened():
+                if not isinstance(self.raw_writer, FfmpegSink):
+                    # VideoWriter encodes on the calling thread - do both writes on a worker
+                    # instead (kept smaller than FRAME_RING_SIZE so queued frames stay valid)
+                    self._write_q = queue.Queue(maxsize=4)
+                    self._writer_thread = threading.Thread(
+                        target=self._writer_loop,
+                        args=(self._write_q, self.raw_writer, self.analysis_writer),
+                        daemon=True)
+                    self._writer_thread.start()
                 self.recording = True
                 self.record_button.config(text="Stop Recording")
                 self.recording_status.config(text="● Recording", fg="green")
@@ -824,10 +1507,28 @@ class RemoteGazeTester:
             self.log_result(f"❌ Recording error: {e}")
             messagebox.showerror("Recording Error", f"Could not start recording: {e}")
     
+    def _writer_loop(self, write_q, raw_writer, analysis_writer):
+        """Write queued (raw, analysis) frame pairs off the UI thread"""
+        while True:
+            item = write_q.get()
+            if item is None:
+                break
+            raw_frame, analysis_frame = item
+            raw_writer.write(raw_frame)
+            if analysis_frame is not None:
+                analysis_writer.write(analysis_frame)
+    
     def stop_recording(self):
         """Stop video recording"""
         self.recording = False
         
+        if self._write_q is not None:
+            # Let the writer finish what's queued before the files are closed
+            self._write_q.put(None)
+            self._writer_thread.join(timeout=5)
+            self._write_q = None
+            self._writer_thread = None
+        
         if self.raw_writer:
             self.raw_writer.release()
             self.raw_writer = None
@@ -868,21 +1569,51 @@ class RemoteGazeTester:
     
     def log_result(self, message):
         """Log result to the results text area"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_message = f"[{timestamp}] {message}\n"
-        
-        self.results_text.insert(tk.END, log_message)
-        self.results_text.see(tk.END)
+        now = int(time.time())
+        if now != self._ts_cache[0]:
+            self._ts_cache = (now, time.strftime("%H:%M:%S", time.localtime(now)))
+        log_message = f"[{self._ts_cache[1]}] {message}\n"
+        
+        # Batch widget updates - one insert/see per flush instead of per line
+        self._log_buf.append(log_message)
+        if not self._log_pending:
+            self._log_pending = True
+            self.root.after(100, self._flush_log)
         print(log_message.strip())  # Also print to console
     
+    def _flush_log(self):
+        """Write the buffered log lines to the results text area"""
+        self._log_pending = False
+        if not self._log_buf:
+            return
+        batch = []
+        while self._log_buf:
+            batch.append(self._log_buf.popleft())
+        self.results_text.insert(tk.END, ''.join(batch))
+        self.results_text.see(tk.END)
+    
     def cleanup(self):
         """Cleanup resources"""
         if self.recording:
             self.stop_recording()
         
+        with self._tts_cond:
+            self._tts_running = False
+            self._tts_cond.notify()
+        self._stop_cached()
+        
+        self._infer_running = False
+        if self._infer_thread is not None:
+            self._infer_thread.join(timeout=1.0)
+            self._infer_thread = None
+        
         if self.cap:
             self.cap.release()
         
+        if self._landmarker is not None:
+            self._landmarker.close()
+            self._landmarker = None
+        
         cv2.destroyAllWindows()
     
     def run(self):
@@ -1,36 +1,60 @@
 #!/usr/bin/env python3
 """
 Run the comprehensive gaze test V2 with real gaze detector
+Use --sessions N to run several tests back to back on one detector
 """
 
 import tkinter as tk
+import argparse
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'gaze_reporting'))
 from comprehensive_gaze_tester_v2 import ComprehensiveGazeTesterV2
 from real_gaze_detector import RealGazeDetector
 
-def main():
+def run_session(gaze_detector):
+    """Run one test window on an already initialized detector"""
     # Create main window
     root = tk.Tk()
     
-    # Initialize real gaze detector
-    gaze_detector = RealGazeDetector()
-    success = gaze_detector.initialize()
-    
-    if not success:
-        print("❌ Failed to initialize gaze detector")
-        return
-    
     # Create tester
     tester = ComprehensiveGazeTesterV2(root, gaze_detector)
     
     # Run
+    root.mainloop()
+    try:
+        root.destroy()
+    except tk.TclError:
+        pass  # Window was already closed
+
+def main(gaze_detector=None, sessions=1):
+    # Initialize real gaze detector (camera + MediaPipe + baseline) unless one is passed in
+    owns_detector = gaze_detector is None
+    if owns_detector:
+        gaze_detector = RealGazeDetector()
+        success = gaze_detector.initialize()
+        
+        if not success:
+            print("❌ Failed to initialize gaze detector")
+            return
+    
     try:
-        root.mainloop()
+        for session in range(sessions):
+            if session:
+                print(f"🔁 Starting session {session + 1}/{sessions} (reusing gaze detector)")
+                gaze_detector.reset_calibration()
+            run_session(gaze_detector)
+            
+            # Closing the window releases the detector - nothing left to reuse
+            if not gaze_detector.is_ready():
+                break
     finally:
-        gaze_detector.release()
+        if owns_detector:
+            gaze_detector.release()
 
 if __name__ == "__main__":
-    main()
-
+    parser = argparse.ArgumentParser(description="Run the comprehensive gaze test V2")
+    parser.add_argument('--sessions', type=int, default=1,
+                        help="number of tests to run back to back on one detector")
+    args = parser.parse_args()
+    main(sessions=args.sessions)
@@ -4,68 +4,64 @@ Simple test to debug PyInstaller issues
 """
 
 import sys
+import importlib
 import traceback
 
-def main():
+def _version(module_name, label):
+    module = importlib.import_module(module_name)
+    return f"{label} version: {module.__version__}"
+
+def _imported(module_name, attr=None):
+    module = importlib.import_module(module_name)
+    if attr:
+        getattr(module, attr)
+        return f"{attr} imported"
+    return f"{module_name} imported"
+
+# (key, description, check) - each check imports only what it needs and returns
+# the success message; run a subset with e.g. `simple_debug_test.py cv2 tkinter`
+CHECKS = [
+    ('basic', "Testing basic imports", lambda: [importlib.import_module(m) for m in ('os', 'time', 'json')] and "Basic imports OK"),
+    ('cv2', "Testing OpenCV", lambda: _version('cv2', "OpenCV")),
+    ('mediapipe', "Testing MediaPipe", lambda: _version('mediapipe', "MediaPipe")),
+    ('numpy', "Testing NumPy", lambda: _version('numpy', "NumPy")),
+    ('tkinter', "Testing Tkinter", lambda: _imported('tkinter') and "Tkinter OK"),
+    ('interface', "Testing custom modules (GazeDetectorInterface)", lambda: _imported('gaze_detector_interface', 'GazeDetectorInterface')),
+    ('real', "Testing custom modules (RealGazeDetector)", lambda: _imported('real_gaze_detector', 'RealGazeDetector')),
+    ('simulated', "Testing custom modules (SimulatedGazeDetector)", lambda: _imported('simulated_gaze_detector', 'SimulatedGazeDetector')),
+    ('tester', "Testing comprehensive tester import", lambda: _imported('comprehensive_gaze_tester_refactored', 'ComprehensiveGazeTester')),
+    ('main', "Testing main script import", lambda: _imported('comprehensive_gaze_tester_real')),
+]
+
+def main(selected=None):
     print("🚀 Starting Navigaze Test...")
     print(f"Python version: {sys.version}")
     print(f"Platform: {sys.platform}")
     
-    try:
-        print("\n1. Testing basic imports...")
-        import os
-        import time
-        import json
-        print("✅ Basic imports OK")
-        
-        print("\n2. Testing OpenCV...")
-        import cv2
-        print(f"✅ OpenCV version: {cv2.__version__}")
-        
-        print("\n3. Testing MediaPipe...")
-        import mediapipe as mp
-        print(f"✅ MediaPipe version: {mp.__version__}")
-        
-        print("\n4. Testing NumPy...")
-        import numpy as np
-        print(f"✅ NumPy version: {np.__version__}")
-        
-        print("\n5. Testing Tkinter...")
-        import tkinter as tk
-        print("✅ Tkinter OK")
-        
-        print("\n6. Testing custom modules...")
-        from gaze_detector_interface import GazeDetectorInterface
-        print("✅ GazeDetectorInterface imported")
-        
-        from real_gaze_detector import RealGazeDetector
-        print("✅ RealGazeDetector imported")
-        
-        from simulated_gaze_detector import SimulatedGazeDetector
-        print("✅ SimulatedGazeDetector imported")
-        
-        print("\n7. Testing comprehensive tester import...")
-        from comprehensive_gaze_tester_refactored import ComprehensiveGazeTester
-        print("✅ ComprehensiveGazeTester imported")
-        
-        print("\n8. Testing main script import...")
-        import comprehensive_gaze_tester_real
-        print("✅ comprehensive_gaze_tester_real imported")
-        
-        print("\n🎉 All imports successful!")
-        print("\nThe issue might be in the main() function or GUI initialization.")
-        
-    except Exception as e:
-        print(f"\n❌ Error during import: {e}")
-        print("\nFull traceback:")
-        traceback.print_exc()
+    checks = [c for c in CHECKS if not selected or c[0] in selected]
+    failed = []
+    for i, (key, description, check) in enumerate(checks, 1):
+        print(f"\n{i}. {description}...")
+        try:
+            print(f"✅ {check()}")
+        except Exception as e:
+            # Keep going so one broken module doesn't hide the state of the rest
+            print(f"❌ Error during import: {e}")
+            print("\nFull traceback:")
+            traceback.print_exc()
+            failed.append(key)
+    
+    if failed:
+        print(f"\n❌ Failed checks: {', '.join(failed)}")
         return False
     
+    print("\n🎉 All imports successful!")
+    print("\nThe issue might be in the main() function or GUI initialization.")
     return True
 
 if __name__ == "__main__":
     try:
-        success = main()
+        success = main(sys.argv[1:])
         if not success:
             print("\n❌ Test failed!")
             sys.exit(1)
@@ -9,27 +9,78 @@ import threading
 import queue
 import sys
 import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
 from unittest.mock import patch, MagicMock
+import numpy as np
 
 # Add the current directory to the path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from comprehensive_gaze_tester import GazeResult
+
+# Blank camera frame shared (read-only) by every mock camera
+_MOCK_FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+_MOCK_FRAME.flags.writeable = False
+
+# Simulated pupil position per gaze direction
+_PUPIL_RELATIVE = {'UP': (0.5, 0.3), 'DOWN': (0.5, 0.7)}
+
+@dataclass(slots=True)
+class FakeLandmarks:
+    """Stand-in for the face landmarks with fixed attributes (no mock lookups)"""
+    pupil_relative: tuple = (0.5, 0.5)
+    confidence: float = 0.9
+    
+    def get_pupil_relative(self):
+        return self.pupil_relative
+    
+    def get_confidence(self):
+        return self.confidence
+
+@dataclass(slots=True)
+class FakeGazeDetector:
+    """Stand-in for the gaze detector that always reports the same result"""
+    result: Optional[GazeResult] = None
+    baseline_y: float = 0.5
+    
+    def update(self, *args, **kwargs):
+        return self.result
+
+@lru_cache(maxsize=16)
+def _build_result(direction, is_continuous, gaze_detected):
+    """Immutable gaze result for one (direction, is_continuous, gaze_detected) combination"""
+    return GazeResult(
+        direction=direction,
+        offset=0.02 if direction == 'UP' else -0.02 if direction == 'DOWN' else 0,
+        is_continuous_gaze=is_continuous,
+        gaze_detected=gaze_detected,
+        pupil_relative=_PUPIL_RELATIVE.get(direction, (0.5, 0.5)),
+        confidence=0.9
+    )
 
 class ComprehensiveTestSimulator:
     def __init__(self):
         self.tester = None
         self.simulation_running = False
         self.step_completed = False
+        self._virt_time = 0.0  # Virtual clock for the simulated holds
+        self._landmarks = {}  # FakeLandmarks per direction, built on first use
+        
+        # Immutable gaze results reused for every simulated frame
+        self._hold_results = {direction: _build_result(direction, True, False) for direction in ('UP', 'DOWN')}
+        self._neutral_result = _build_result(None, False, False)
+        
+    def _sync_virtual_time(self):
+        """Bring the virtual clock up to real time (never backwards)"""
+        self._virt_time = max(self._virt_time, time.time())
         
     def create_mock_camera(self):
         """Create a mock camera that returns simulated frames"""
         mock_camera = MagicMock()
         
-        # Create a mock frame (numpy array)
-        import numpy as np
-        mock_frame = np.zeros((480, 640, 3), dtype=np.uint8)
-        
-        # Mock the read method to return True and the frame
-        mock_camera.read.return_value = (True, mock_frame)
+        # Mock the read method to return True and the shared blank frame
+        mock_camera.read.return_value = (True, _MOCK_FRAME)
         mock_camera.isOpened.return_value = True
         
         return mock_camera
@@ -51,37 +102,16 @@ class ComprehensiveTestSimulator:
         
     def simulate_gaze_detection(self, direction, is_continuous=False, gaze_detected=True):
         """Simulate gaze detection results"""
-        # Create mock face landmarks
-        mock_landmarks = MagicMock()
-        
-        # Mock pupil positions based on direction
-        if direction == 'UP':
-            pupil_relative = (0.5, 0.3)  # Higher Y position
-        elif direction == 'DOWN':
-            pupil_relative = (0.5, 0.7)  # Lower Y position
-        else:
-            pupil_relative = (0.5, 0.5)  # Center position
-            
-        mock_landmarks.get_pupil_relative.return_value = pupil_relative
-        mock_landmarks.get_confidence.return_value = 0.9
-        
-        # Create mock gaze detector
-        mock_gaze_detector = MagicMock()
-        mock_gaze_detector.baseline_y = 0.5
+        # Face landmarks per direction (higher Y for DOWN, lower for UP)
+        landmarks = self._landmarks.get(direction)
+        if landmarks is None:
+            landmarks = FakeLandmarks(_PUPIL_RELATIVE.get(direction, (0.5, 0.5)))
+            self._landmarks[direction] = landmarks
         
-        # Mock gaze result
-        gaze_result = {
-            'direction': direction,
-            'offset': 0.02 if direction == 'UP' else -0.02 if direction == 'DOWN' else 0,
-            'is_continuous_gaze': is_continuous,
-            'gaze_detected': gaze_detected,
-            'pupil_relative': pupil_relative,
-            'confidence': 0.9
-        }
+        # Gaze result (shared instance per argument combination)
+        gaze_result = _build_result(direction, is_continuous, gaze_detected)
         
-        mock_gaze_detector.update.return_value = gaze_result
-        
-        return mock_landmarks, mock_gaze_detector, gaze_result
+        return landmarks, FakeGazeDetector(gaze_result), gaze_result
         
     def patch_imports(self):
         """Patch the imports to use our mock objects"""
@@ -185,65 +215,51 @@ class ComprehensiveTestSimulator:
         """Simulate long holds in a direction"""
         print(f"🎭 Simulating {count} long {direction} holds ({duration}s each)")
         
+        # Drive the tester on a virtual clock instead of sleeping between frames
+        self._sync_virtual_time()
+        with patch('time.time', lambda: self._virt_time):
+            self._simulate_long_holds(direction, count, duration)
+    
+    def _simulate_long_holds(self, direction, count, duration):
+        """Hold loop for simulate_long_holds (runs on the virtual clock)"""
         for hold_num in range(count):
             print(f"  Hold {hold_num + 1}/{count}")
             
             # Simulate the hold
+            gaze_result = self._hold_results[direction]
             start_time = time.time()
             while time.time() - start_time < duration + 0.5:  # Add buffer
-                # Create gaze result
-                gaze_result = {
-                    'direction': direction,
-                    'offset': 0.02 if direction == 'UP' else -0.02,
-                    'is_continuous_gaze': True,
-                    'gaze_detected': False,
-                    'pupil_relative': (0.5, 0.3 if direction == 'UP' else 0.7),
-                    'confidence': 0.9
-                }
-                
                 # Process the gaze
                 if hasattr(self.tester, 'process_step_gaze'):
                     self.tester.process_step_gaze(gaze_result)
                 
-                time.sleep(0.1)  # 100ms intervals
+                self._virt_time += 0.1  # 100ms intervals
                 
             # Brief neutral break between holds
             if hold_num < count - 1:
                 print("    Neutral break...")
                 for _ in range(5):  # 0.5 seconds of neutral
-                    neutral_result = {
-                        'direction': None,
-                        'offset': 0,
-                        'is_continuous_gaze': False,
-                        'gaze_detected': False,
-                        'pupil_relative': (0.5, 0.5),
-                        'confidence': 0.9
-                    }
-                    
                     if hasattr(self.tester, 'process_step_gaze'):
-                        self.tester.process_step_gaze(neutral_result)
+                        self.tester.process_step_gaze(self._neutral_result)
                     
-                    time.sleep(0.1)
+                    self._virt_time += 0.1
                     
     def simulate_neutral_hold(self, duration):
         """Simulate neutral hold"""
         print(f"🎭 Simulating neutral hold for {duration}s")
         
+        self._sync_virtual_time()
+        with patch('time.time', lambda: self._virt_time):
+            self._simulate_neutral_hold(duration)
+    
+    def _simulate_neutral_hold(self, duration):
+        """Hold loop for simulate_neutral_hold (runs on the virtual clock)"""
         start_time = time.time()
         while time.time() - start_time < duration + 0.5:
-            neutral_result = {
-                'direction': None,
-                'offset': 0,
-                'is_continuous_gaze': False,
-                'gaze_detected': False,
-                'pupil_relative': (0.5, 0.5),
-                'confidence': 0.9
-            }
-            
             if hasattr(self.tester, 'process_step_gaze'):
-                self.tester.process_step_gaze(neutral_result)
+                self.tester.process_step_gaze(self._neutral_result)
             
-            time.sleep(0.1)
+            self._virt_time += 0.1
 
 def main():
     """Main function to run the simulation"""
@@ -4,153 +4,283 @@ Simulation script for testing the comprehensive gaze tester
 This script simulates gaze inputs to test the auto-advance functionality
 """
 
+import heapq
+import itertools
+import math
+import sys
 import time
 import threading
-import queue
+from collections import deque
+from types import MappingProxyType
+from unittest.mock import patch
+import numpy as np
 from comprehensive_gaze_tester import RemoteGazeTester
 
+def _gaze_template(direction, is_continuous, gaze_detected):
+    """Read-only gaze result sent unchanged for every simulated tick"""
+    if direction is None:
+        offset, pupil_y = 0, 0.5
+    else:
+        offset, pupil_y = (0.02, 0.3) if direction == 'UP' else (-0.02, 0.7)
+    return MappingProxyType({
+        'direction': direction,
+        'offset': offset,
+        'is_continuous_gaze': is_continuous,
+        'gaze_detected': gaze_detected,
+        'pupil_relative': (0.5, pupil_y),
+        'confidence': 0.9
+    })
+
+# Every gaze result the simulator sends, keyed by (direction, is_continuous, gaze_detected):
+# continuous holds and neutral, plus single quick gazes
+_TEMPLATES = {
+    key: _gaze_template(*key)
+    for key in (('UP', True, False), ('DOWN', True, False), (None, False, False),
+                ('UP', False, True), ('DOWN', False, True))
+}
+
+# Scheduled steps as structured arrays (one row per simulated gaze result)
+DIRECTION_IDS = {None: 0, 'UP': 1, 'DOWN': 2}
+DIRECTION_NAMES = (None, 'UP', 'DOWN')
+GAZE_DTYPE = np.dtype([('t', 'f8'), ('dir', 'u1'), ('offset', 'f4'), ('continuous', '?'),
+                       ('detected', '?'), ('px', 'f4'), ('py', 'f4'), ('conf', 'f4')])
+
+def _ticks(duration, interval):
+    """Number of results a steady stream sends in duration seconds"""
+    return max(1, math.ceil(round(duration / interval, 6)))
+
+def gaze_timeline(rows):
+    """GAZE_DTYPE timeline for (time, gaze result) pairs"""
+    return np.array([
+        (t, DIRECTION_IDS[g['direction']], g['offset'], g['is_continuous_gaze'],
+         g['gaze_detected'], *g['pupil_relative'], g['confidence'])
+        for t, g in rows
+    ], dtype=GAZE_DTYPE)
+
+def iter_gaze_results(timeline):
+    """The shared read-only gaze result for each row of a timeline"""
+    keys = zip(timeline['dir'].tolist(), timeline['continuous'].tolist(), timeline['detected'].tolist())
+    for d, continuous, detected in keys:
+        yield _TEMPLATES[DIRECTION_NAMES[d], continuous, detected]
+
 class GazeSimulator:
+    # Continuous holds (and neutral) and single quick gazes, per direction
+    _GAZE_TEMPLATES = {
+        'UP': _TEMPLATES['UP', True, False],
+        'DOWN': _TEMPLATES['DOWN', True, False],
+        None: _TEMPLATES[None, False, False],
+    }
+    _QUICK_TEMPLATES = {
+        'UP': _TEMPLATES['UP', False, True],
+        'DOWN': _TEMPLATES['DOWN', False, True],
+    }
+    _tick_period = 0.1  # Producer wakeup period; everything due within a tick goes out together
+    
     def __init__(self):
         self.tester = None
-        self.simulation_queue = queue.Queue()
-        self.running = False
+        self._stop = threading.Event()  # Set = not running; wait() returns early on cancel
+        self._stop.set()
+        self._process = lambda gaze_result: None  # Bound once per run (tester.process_step_gaze)
+        self._process_batch = self._process_each
+        self._scripts = {}  # (direction, duration, interval) -> (timeline, length)
+        self._status_buf = deque(maxlen=256)  # Progress lines, written out once a second
+        self._events = []  # Heap of (monotonic time, seq, send, payload)
+        self._event_seq = itertools.count()  # Keeps same-time events in scheduling order
+        self._fast = False  # Replay scheduled events at once on a virtual clock
+        
+        # Step type -> simulation; sequence_* types are added when the steps are set up
+        self._dispatch = {
+            'long_up': lambda step: self.simulate_long_holds('UP', step['repetitions'], step['hold_duration']),
+            'long_down': lambda step: self.simulate_long_holds('DOWN', step['repetitions'], step['hold_duration']),
+            'neutral_hold': lambda step: self.simulate_neutral_gaze(step['hold_duration']),
+        }
         
     def create_tester(self):
         """Create the gaze tester instance"""
         self.tester = RemoteGazeTester()
         return self.tester
         
-    def simulate_gaze_sequence(self, direction, duration, interval=0.1):
-        """Simulate a gaze in a specific direction for a given duration"""
-        print(f"🎭 SIMULATING: {direction} gaze for {duration}s")
-        
-        start_time = time.time()
-        while time.time() - start_time < duration and self.running:
-            # Create a simulated gaze result
-            gaze_result = {
-                'direction': direction,
-                'offset': 0.02 if direction == 'UP' else -0.02,
-                'is_continuous_gaze': True,
-                'gaze_detected': False,  # Simulate continuous gaze
-                'pupil_relative': (0.5, 0.3 if direction == 'UP' else 0.7),
-                'confidence': 0.9
-            }
+    def _process_each(self, gaze_results):
+        """Batch fallback for testers without process_step_gaze_batch"""
+        for gaze_result in gaze_results:
+            self._process(gaze_result)
             
-            # Send to tester
-            if hasattr(self.tester, 'process_step_gaze'):
-                self.tester.process_step_gaze(gaze_result)
-            
-            time.sleep(interval)
+    def _status(self, message):
+        """Queue a progress line for the next status flush"""
+        self._status_buf.append(message)
+        
+    def _flush_status(self):
+        """Write all queued progress lines in one go"""
+        lines = []
+        while True:
+            try:
+                lines.append(self._status_buf.popleft())
+            except IndexError:  # Empty (the flush thread may drain it at the same time)
+                break
+        if lines:
+            sys.stdout.write('\n'.join(lines) + '\n')
+            sys.stdout.flush()
             
-    def simulate_neutral_gaze(self, duration, interval=0.1):
-        """Simulate neutral gaze (no direction)"""
-        print(f"🎭 SIMULATING: Neutral gaze for {duration}s")
-        
-        start_time = time.time()
-        while time.time() - start_time < duration and self.running:
-            # Create a neutral gaze result
-            gaze_result = {
-                'direction': None,
-                'offset': 0,
-                'is_continuous_gaze': False,
-                'gaze_detected': False,
-                'pupil_relative': (0.5, 0.5),
-                'confidence': 0.9
-            }
+    def _status_loop(self):
+        """Flush progress once a second while the simulation runs"""
+        while not self._stop.wait(1.0):
+            self._flush_status()
             
-            # Send to tester
-            if hasattr(self.tester, 'process_step_gaze'):
-                self.tester.process_step_gaze(gaze_result)
+    def _build_script(self, direction, duration, interval):
+        """Timeline of (offset, gaze result) for a steady gaze, plus its length (cached)"""
+        key = (direction, duration, interval)
+        script = self._scripts.get(key)
+        if script is None:
+            gaze_result = self._GAZE_TEMPLATES[direction]
+            ticks = _ticks(duration, interval)
+            script = (tuple((i * interval, gaze_result) for i in range(ticks)), ticks * interval)
+            self._scripts[key] = script
+        return script
+        
+    def _schedule(self, at, send, payload):
+        """Queue send(payload) for the absolute monotonic time at"""
+        heapq.heappush(self._events, (at, next(self._event_seq), send, payload))
+        
+    def _schedule_script(self, t0, script):
+        """Queue a timeline starting at t0; returns the time it ends"""
+        timeline, length = script
+        for offset, gaze_result in timeline:
+            self._schedule(t0 + offset, self._process, gaze_result)
+        return t0 + length
+        
+    def _run_events(self, until):
+        """Single period-driven producer: each tick sends whatever is due, then
+        sleeps to the next tick boundary. Runs until the queue is empty and
+        until has passed; False if the simulation was stopped. In fast mode
+        the queue is replayed at once instead."""
+        if self._fast:
+            return self._replay_events()
+        events = self._events
+        next_tick = time.monotonic()
+        while True:
+            now = time.monotonic()
+            while events and events[0][0] <= now:
+                _, _, send, payload = heapq.heappop(events)
+                send(payload)
+            if not events and now >= until:
+                return True
+            # Absolute tick boundaries, so per-tick delays don't accumulate
+            next_tick += self._tick_period
+            if self._stop.wait(max(0.0, next_tick - time.monotonic())):
+                events.clear()
+                return False
+        
+    def _replay_events(self):
+        """Fast mode: hand every queued gaze result to the tester as one
+        timeline batch, on a virtual clock that follows each row's timestamp"""
+        rows = []
+        while self._events:
+            at, _, send, payload = heapq.heappop(self._events)
+            if send == self._process:
+                rows.append((at, payload))
+            elif send == self._process_batch:
+                rows.extend((at, gaze_result) for gaze_result in payload)
+            else:
+                send(payload)  # Progress lines go out straight away
+        timeline = gaze_timeline(rows)
+        self._status(f"  (fast) {len(timeline)} gaze results")
+        
+        # The tester times holds with time.time(), so the clock follows each row's timestamp
+        offset = time.time() - time.monotonic()
+        clock = [offset]
+        def results():
+            for t, gaze_result in zip(timeline['t'].tolist(), iter_gaze_results(timeline)):
+                clock[0] = offset + t
+                yield gaze_result
+        
+        with patch('time.time', lambda: clock[0]):
+            self._process_batch(results())
+        return True
+        
+    def simulate_gaze_sequence(self, direction, duration, interval=0.1):
+        """Simulate a gaze in a specific direction for a given duration (False if stopped)"""
+        self._status(f"🎭 SIMULATING: {direction} gaze for {duration}s")
+        return self._run_events(self._schedule_script(time.monotonic(), self._build_script(direction, duration, interval)))
             
-            time.sleep(interval)
+    def simulate_neutral_gaze(self, duration, interval=0.1):
+        """Simulate neutral gaze (no direction; False if stopped)"""
+        self._status(f"🎭 SIMULATING: Neutral gaze for {duration}s")
+        return self._run_events(self._schedule_script(time.monotonic(), self._build_script(None, duration, interval)))
             
     def simulate_quick_gazes(self, direction, count, interval=0.5):
         """Simulate quick gazes in a direction"""
-        print(f"🎭 SIMULATING: {count} quick {direction} gazes")
+        self._status(f"🎭 SIMULATING: {count} quick {direction} gazes")
+        
+        gaze_result = self._QUICK_TEMPLATES[direction]
+        neutral_result = self._GAZE_TEMPLATES[None]
         
+        t = time.monotonic()
         for i in range(count):
-            if not self.running:
-                break
-                
             # Quick gaze detection
-            gaze_result = {
-                'direction': direction,
-                'offset': 0.02 if direction == 'UP' else -0.02,
-                'is_continuous_gaze': False,
-                'gaze_detected': True,
-                'pupil_relative': (0.5, 0.3 if direction == 'UP' else 0.7),
-                'confidence': 0.9
-            }
-            
-            if hasattr(self.tester, 'process_step_gaze'):
-                self.tester.process_step_gaze(gaze_result)
+            self._schedule(t, self._process, gaze_result)
             
-            # Brief neutral between gazes
-            time.sleep(0.2)
-            self.simulate_neutral_gaze(0.3)
-            time.sleep(interval)
+            # Brief neutral between gazes - one neutral frame is enough for the
+            # tester, then hold off for the rest of the 0.3s neutral plus the interval
+            self._schedule(t + 0.2, self._process, neutral_result)
+            t += 0.5 + interval
+        self._run_events(t)
             
     def simulate_long_holds(self, direction, count, hold_duration=5):
         """Simulate long holds in a direction"""
-        print(f"🎭 SIMULATING: {count} long {direction} holds ({hold_duration}s each)")
+        self._status(f"🎭 SIMULATING: {count} long {direction} holds ({hold_duration}s each)")
         
+        # The whole step goes on one timeline, played by a single producer loop
+        hold = self._build_script(direction, hold_duration + 0.5, 0.1)
+        neutral = self._build_script(None, 1.0, 0.1)
+        total = f"/{count}"
+        t = time.monotonic()
         for i in range(count):
-            if not self.running:
-                break
-                
-            print(f"  Hold {i+1}/{count}")
+            self._schedule(t, self._status, "  Hold " + str(i + 1) + total)
             
             # Start hold
-            self.simulate_gaze_sequence(direction, hold_duration + 0.5)
+            t = self._schedule_script(t, hold)
             
             # Brief neutral between holds
             if i < count - 1:  # Don't add neutral after last hold
-                self.simulate_neutral_gaze(1.0)
+                t = self._schedule_script(t, neutral)
+        self._run_events(t)
                 
     def simulate_sequence_pattern(self, pattern, repetitions):
         """Simulate a sequence pattern (e.g., UP-DOWN-UP-DOWN)"""
-        print(f"🎭 SIMULATING: {repetitions} repetitions of {'→'.join(pattern)}")
+        self._status(f"🎭 SIMULATING: {repetitions} repetitions of {'→'.join(pattern)}")
         
+        # Quick gazes are counted as they arrive (no timing involved), so each
+        # repetition sends the same prebuilt batch in one call
+        batch = tuple(map(self._QUICK_TEMPLATES.__getitem__, pattern))
+        total = f"/{repetitions}"
+        t = time.monotonic()
         for rep in range(repetitions):
-            if not self.running:
-                break
-                
-            print(f"  Sequence {rep+1}/{repetitions}")
+            self._schedule(t, self._status, "  Sequence " + str(rep + 1) + total)
             
-            for direction in pattern:
-                if not self.running:
-                    break
-                    
-                # Quick gaze for each direction in sequence
-                gaze_result = {
-                    'direction': direction,
-                    'offset': 0.02 if direction == 'UP' else -0.02,
-                    'is_continuous_gaze': False,
-                    'gaze_detected': True,
-                    'pupil_relative': (0.5, 0.3 if direction == 'UP' else 0.7),
-                    'confidence': 0.9
-                }
-                
-                if hasattr(self.tester, 'process_step_gaze'):
-                    self.tester.process_step_gaze(gaze_result)
-                
-                # Brief pause between directions
-                time.sleep(0.3)
+            # Whole repetition in one call, then the 0.3s-per-direction pause
+            self._schedule(t, self._process_batch, batch)
+            t += 0.3 * len(pattern)
                 
             # Pause between sequences
             if rep < repetitions - 1:
-                time.sleep(0.5)
+                t += 0.5
+        self._run_events(t)
                 
-    def run_test_simulation(self):
-        """Run a complete test simulation"""
+    def run_test_simulation(self, fast=False):
+        """Run a complete test simulation (fast: replay each step's schedule at once)"""
         print("🚀 Starting Gaze Test Simulation")
         print("=" * 50)
         
-        self.running = True
+        self._stop.clear()
+        self._fast = fast
+        self._process = getattr(self.tester, 'process_step_gaze', lambda gaze_result: None)
+        self._process_batch = getattr(self.tester, 'process_step_gaze_batch', self._process_each)
+        threading.Thread(target=self._status_loop, daemon=True).start()
         
         try:
             # Wait for tester to be ready
-            time.sleep(2)
+            if self._stop.wait(2):
+                return
             
             # Test the first few steps
             test_steps = [
@@ -178,33 +308,32 @@ class GazeSimulator:
                     'repetitions': 3
                 }
             ]
+            for step in test_steps:
+                if step['type'].startswith('sequence_'):
+                    self._dispatch.setdefault(step['type'], lambda step: self.simulate_sequence_pattern(step['pattern'], step['repetitions']))
             
             for step in test_steps:
-                if not self.running:
-                    break
-                    
-                print(f"\n📋 Testing: {step['name']}")
-                print("-" * 30)
+                self._status(f"\n📋 Testing: {step['name']}")
+                self._status("-" * 30)
                 
-                if step['type'] == 'long_up':
-                    self.simulate_long_holds('UP', step['repetitions'], step['hold_duration'])
-                elif step['type'] == 'long_down':
-                    self.simulate_long_holds('DOWN', step['repetitions'], step['hold_duration'])
-                elif step['type'] == 'neutral_hold':
-                    self.simulate_neutral_gaze(step['hold_duration'])
-                elif step['type'].startswith('sequence_'):
-                    self.simulate_sequence_pattern(step['pattern'], step['repetitions'])
+                simulate = self._dispatch.get(step['type'])
+                if simulate:
+                    simulate(step)
                 
                 # Wait for step completion
-                print(f"⏳ Waiting for step completion...")
-                time.sleep(2)
+                self._status(f"⏳ Waiting for step completion...")
+                if self._stop.wait(2):
+                    break
                 
         except KeyboardInterrupt:
+            self._flush_status()
             print("\n🛑 Simulation interrupted by user")
         except Exception as e:
-            print(f"\n❌ Simulation error: {e}")
+            self._flush_status()
+            print(f"\n❌ Simulation error: {e}", file=sys.stderr)
         finally:
-            self.running = False
+            self._stop.set()
+            self._flush_status()
             print("\n✅ Simulation completed")
 
 def main():
@@ -215,24 +344,16 @@ def main():
     
     simulator = GazeSimulator()
     
-    # Create tester in a separate thread
-    def create_tester_thread():
-        try:
-            tester = simulator.create_tester()
-            print("✅ Tester created successfully")
-        except Exception as e:
-            print(f"❌ Failed to create tester: {e}")
-            return
-    
-    # Start tester creation
-    tester_thread = threading.Thread(target=create_tester_thread)
-    tester_thread.start()
-    
-    # Wait a bit for tester to initialize
-    time.sleep(3)
+    # Create the tester up front - the simulation needs it anyway
+    try:
+        simulator.create_tester()
+        print("✅ Tester created successfully")
+    except Exception as e:
+        print(f"❌ Failed to create tester: {e}")
+        return
     
-    # Start simulation
-    simulator.run_test_simulation()
+    # Start simulation (--fast replays each step without waiting in real time)
+    simulator.run_test_simulation(fast='--fast' in sys.argv[1:])
 
 if __name__ == "__main__":
     main()
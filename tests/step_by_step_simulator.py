@@ -5,17 +5,26 @@ Tests each component of the comprehensive gaze tester individually
 """
 
 import tkinter as tk
+import sys
 import time
 import threading
+from collections import deque
 from comprehensive_gaze_tester_refactored import ComprehensiveGazeTester
 from simulated_gaze_detector import SimulatedGazeDetector
 
+# Live-feedback poll rate while a simulation is monitored (the end is scheduled separately)
+MONITOR_POLL_MS = 250
+
 class StepByStepSimulator:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Step-by-Step Gaze Tester Simulator")
         self.root.geometry("400x300")
         
+        # (time, message) pairs waiting for the next 100 ms log flush
+        self._log_buf = deque()
+        self._log_flush_scheduled = False
+        
         # Create control panel
         self.create_control_panel()
         
@@ -26,6 +35,10 @@ class StepByStepSimulator:
         # Test state
         self.current_test = None
         self.test_results = []
+        self._monitor_deadline = 0
+        # Pending root.after ids, so a new run can cancel the previous one's chains
+        self._monitor_poll_id = None
+        self._monitor_finish_id = None
         
     def create_control_panel(self):
         """Create the control panel for running tests"""
@@ -65,12 +78,30 @@ class StepByStepSimulator:
         clear_btn.pack(pady=5)
         
     def log_result(self, message):
-        """Log a result message"""
-        timestamp = time.strftime("%H:%M:%S")
-        self.results_text.insert(tk.END, f"[{timestamp}] {message}\n")
+        """Log a result message (written out in batches by _flush_log)"""
+        self._log_buf.append((time.time(), message))
+        if not self._log_flush_scheduled:
+            self._log_flush_scheduled = True
+            self.root.after(100, self._flush_log)
+            
+    def _flush_log(self):
+        """Write all pending log lines with one insert, one see and one console write"""
+        self._log_flush_scheduled = False
+        lines = []
+        last_second, timestamp = None, ""
+        while self._log_buf:
+            logged_at, message = self._log_buf.popleft()
+            second = int(logged_at)
+            if second != last_second:
+                last_second, timestamp = second, time.strftime("%H:%M:%S", time.localtime(second))
+            lines.append(f"[{timestamp}] {message}\n")
+        if not lines:
+            return
+        text = ''.join(lines)
+        self.results_text.insert(tk.END, text)
         self.results_text.see(tk.END)
-        self.root.update()
-        print(f"[{timestamp}] {message}")
+        sys.stdout.write(text)
+        sys.stdout.flush()
         
     def clear_results(self):
         """Clear the results display"""
@@ -194,20 +225,35 @@ class StepByStepSimulator:
             
     def _monitor_simulation(self, test_type, duration):
         """Monitor a simulation for the given duration"""
-        start_time = time.time()
-        
-        def check_simulation():
-            elapsed = time.time() - start_time
-            if elapsed < duration:
-                # Check if gaze detector is providing input
-                gaze_result = self.gaze_detector.update()
-                if gaze_result and gaze_result.get('direction'):
-                    self.log_result(f"👁️ Detected {gaze_result['direction']} gaze")
-                self.root.after(100, check_simulation)
-            else:
-                self.log_result(f"✅ Test completed: {test_type} simulation finished")
-                
-        check_simulation()
+        self._cancel_monitor()
+        self._monitor_deadline = time.monotonic() + duration
+        self._monitor_finish_id = self.root.after(int(duration * 1000), lambda: self._finish_monitor(test_type))
+        self._poll_monitor()
+        
+    def _cancel_monitor(self):
+        """Cancel a still-running monitor's poll and finish callbacks"""
+        for after_id in (self._monitor_poll_id, self._monitor_finish_id):
+            if after_id is not None:
+                self.root.after_cancel(after_id)
+        self._monitor_poll_id = self._monitor_finish_id = None
+        
+    def _poll_monitor(self):
+        """Report detector input every MONITOR_POLL_MS until the deadline"""
+        self._monitor_poll_id = None
+        remaining_ms = int((self._monitor_deadline - time.monotonic()) * 1000)
+        if remaining_ms <= 0:
+            return
+        
+        # Check if gaze detector is providing input
+        gaze_result = self.gaze_detector.update()
+        if gaze_result and gaze_result.get('direction'):
+            self.log_result(f"👁️ Detected {gaze_result['direction']} gaze")
+        self._monitor_poll_id = self.root.after(min(MONITOR_POLL_MS, remaining_ms), self._poll_monitor)
+        
+    def _finish_monitor(self, test_type):
+        """Called once when the monitored simulation's time is up"""
+        self._monitor_finish_id = None
+        self.log_result(f"✅ Test completed: {test_type} simulation finished")
         
     def run(self):
         """Run the simulator"""
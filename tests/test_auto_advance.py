@@ -7,10 +7,71 @@ This simulates the test steps to ensure auto-advance works correctly
 import time
 import sys
 import os
+from types import MappingProxyType, SimpleNamespace
 
 # Add the current directory to the path so we can import our modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Try to import numba for the long-hold state machine (plain Python otherwise)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+_UPDOWN = frozenset(('UP', 'DOWN'))
+# Direction <-> code for _hold_step (0 = no direction / not tracking)
+_DIR_CODES = {'UP': 1, 'DOWN': 2}
+_DIR_NAMES = (None, 'UP', 'DOWN')
+
+def _hold_step(now, dir_code, target_code, state_code, hold_start, required):
+    """One frame of long-hold tracking.
+    
+    Returns (state_code, hold_start, completed, hold_duration); a hold_start
+    of 0.0 means no hold is being timed.
+    """
+    if dir_code != target_code:
+        # Neutral or wrong direction - reset tracking
+        return 0, 0.0, False, 0.0
+    if state_code != target_code:
+        # New gaze detected - record start time
+        return target_code, now, False, 0.0
+    if hold_start:
+        # Continuing the same gaze - check duration
+        hold_duration = now - hold_start
+        if hold_duration >= required:
+            # Completed - reset tracking to prevent multiple registrations
+            return 0, 0.0, True, hold_duration
+    return state_code, hold_start, False, 0.0
+
+if NUMBA_AVAILABLE:
+    _hold_step = njit(cache=True)(_hold_step)
+
+class StepState:
+    """Tracking data for the running step (slotted - read on every gaze frame)"""
+    __slots__ = ('detections', 'start_time', 'current_gaze_state', 'hold_start_time',
+                 'up_hold_count', 'down_hold_count')
+    
+    def __init__(self, start_time):
+        self.detections = []
+        self.start_time = start_time
+        self.current_gaze_state = None
+        self.hold_start_time = None
+        self.up_hold_count = 0
+        self.down_hold_count = 0
+        
+    def add_hold(self, detection):
+        """Record a completed long hold and count it for its direction"""
+        self.detections.append(detection)
+        if detection['direction'] == 'UP':
+            self.up_hold_count += 1
+        else:
+            self.down_hold_count += 1
+            
+    def hold_count(self, direction):
+        """Completed long holds in direction"""
+        return self.up_hold_count if direction == 'UP' else self.down_hold_count
+
 class AutoAdvanceTester:
     def __init__(self):
         # Simulate the test steps
@@ -36,148 +97,156 @@ class AutoAdvanceTester:
         
         self.current_step = 0
         self.step_data = None
+        self._active = None  # Resolved metadata of the running step (set by start_step)
+        self._step_dirty = False  # A detection was added since the last completion check
         self.test_results = []
+        self.time_fn = time.monotonic  # Clock for all step timing (the test swaps in a fake one)
+        self._gaze_templates = {}  # (direction, is_continuous, gaze_detected) -> read-only gaze result
         
-    def simulate_gaze_result(self, direction, is_continuous=False, gaze_detected=True):
-        """Simulate a gaze result"""
-        return {
-            'direction': direction,
-            'offset': 0.02 if direction == 'UP' else -0.02,
-            'is_continuous_gaze': is_continuous,
-            'gaze_detected': gaze_detected,
-            'pupil_relative': (0.5, 0.3 if direction == 'UP' else 0.7),
-            'confidence': 0.9
+        # Step type -> completion check / result analysis
+        self._completion = {
+            'quick_up': self._check_quick,
+            'quick_down': self._check_quick,
+            'long_up': self._check_long,
+            'long_down': self._check_long,
+            'neutral_hold': self._check_neutral,
         }
+        self._analyzers = {
+            'long_up': self._analyze_long,
+            'long_down': self._analyze_long,
+            'neutral_hold': self._analyze_neutral,
+        }
+        
+    def simulate_gaze_result(self, direction, is_continuous=False, gaze_detected=True):
+        """Simulate a gaze result (a shared read-only dict - process_step_gaze only reads it)"""
+        key = (direction, is_continuous, gaze_detected)
+        template = self._gaze_templates.get(key)
+        if template is None:
+            template = self._gaze_templates[key] = MappingProxyType({
+                'direction': direction,
+                'offset': 0.02 if direction == 'UP' else -0.02,
+                'is_continuous_gaze': is_continuous,
+                'gaze_detected': gaze_detected,
+                'pupil_relative': (0.5, 0.3 if direction == 'UP' else 0.7),
+                'confidence': 0.9
+            })
+        return template
         
     def check_step_completion(self):
         """Check if current step is complete and should auto-advance"""
         if not self.step_data:
             return False
         
-        step = self.test_steps[self.current_step]
-        detections = self.step_data['detections']
-        
-        if step['type'] in ['quick_up', 'quick_down']:
-            # Check if we have enough quick gazes
-            target_direction = 'UP' if step['type'] == 'quick_up' else 'DOWN'
-            count = len([d for d in detections if d['direction'] == target_direction and not d['is_continuous']])
-            target = step.get('target_count', 5)
-            return count >= target
-            
-        elif step['type'] in ['long_up', 'long_down']:
-            # Check if we have enough long holds (completed ones with hold_duration)
-            target_direction = 'UP' if step['type'] == 'long_up' else 'DOWN'
-            count = len([d for d in detections if d['direction'] == target_direction and d.get('hold_duration', 0) > 0])
-            target = step.get('repetitions', 3)
-            return count >= target
-            
-        elif step['type'] == 'neutral_hold':
-            # Check if we've held neutral long enough
-            elapsed_time = time.time() - self.step_data['start_time']
-            target_duration = step.get('hold_duration', 5)
-            return elapsed_time >= target_duration
-            
-        return False
+        # Counts only change when a detection is added; only time moves a neutral hold
+        if not self._step_dirty and not self._active.is_neutral:
+            return False
+        self._step_dirty = False
+        
+        check = self._completion.get(self._active.type)
+        return check(self._active, self.step_data) if check else False
+        
+    def _check_quick(self, active, step_data):
+        """Check if we have enough quick gazes"""
+        target_direction = active.target_dir
+        count = len([d for d in step_data.detections if d['direction'] == target_direction and not d['is_continuous']])
+        return count >= active.target_count
+        
+    def _check_long(self, active, step_data):
+        """Check if we have enough long holds (completed ones with hold_duration)"""
+        return step_data.hold_count(active.target_dir) >= active.target_count
+        
+    def _check_neutral(self, active, step_data):
+        """Check if we've held neutral long enough"""
+        return self.time_fn() - step_data.start_time >= active.required_duration
         
     def process_step_gaze(self, gaze_result):
         """Process gaze detection for current step (simplified version)"""
         if not self.step_data:
             return
+        now = self.time_fn()  # One clock read for the whole frame
             
         # Process both new gaze detections and continuous gaze states
         direction = gaze_result.get('direction')
         is_continuous = gaze_result.get('is_continuous_gaze', False)
         gaze_detected = gaze_result.get('gaze_detected', False)
         
+        # Neutral hold only needs stray UP/DOWN gazes recorded and the elapsed time
+        if self._active.is_neutral:
+            elapsed = now - self.step_data.start_time
+            if direction in _UPDOWN:
+                self.step_data.detections.append({
+                    'timestamp': elapsed,
+                    'direction': direction,
+                    'offset': gaze_result.get('offset', 0),
+                    'is_continuous': is_continuous
+                })
+            if elapsed >= self._active.required_duration:
+                print(f"🎯 Step {self.current_step + 1} target reached! Auto-advancing...")
+                self.complete_current_step()
+                return True
+            return False
+        
         # Handle neutral gaze (no direction) - reset hold tracking
-        if not direction and self.step_data:
-            step = self.test_steps[self.current_step]
-            if step['type'] in ['long_up', 'long_down']:
-                if 'current_gaze_state' in self.step_data and self.step_data['current_gaze_state']:
-                    self.step_data['current_gaze_state'] = None
-                    self.step_data['hold_start_time'] = None
+        if not direction:
+            if self._active.is_long:
+                if self.step_data.current_gaze_state:
+                    self.step_data.current_gaze_state = None
+                    self.step_data.hold_start_time = None
         
         # Process gaze results if we have a direction OR if we're already tracking a hold
-        if direction or (self.step_data and 
-                        'current_gaze_state' in self.step_data and 
-                        self.step_data.get('current_gaze_state')):
+        if direction or self.step_data.current_gaze_state:
             if direction:  # Only process if we have a valid direction
                 detection = {
-                    'timestamp': time.time() - self.step_data['start_time'],
+                    'timestamp': now - self.step_data.start_time,
                     'direction': direction,
                     'offset': gaze_result.get('offset', 0),
                     'is_continuous': is_continuous
                 }
                 
                 # Check if we're in a long hold step
-                step = self.test_steps[self.current_step]
-                if step['type'] in ['long_up', 'long_down']:
-                    required_duration = step.get('hold_duration', 5)  # Default 5 seconds
-                    target_direction = 'UP' if step['type'] == 'long_up' else 'DOWN'
-                    
-                    # Initialize tracking variables (only once)
-                    if 'current_gaze_state' not in self.step_data:
-                        self.step_data['current_gaze_state'] = None
-                    if 'hold_start_time' not in self.step_data:
-                        self.step_data['hold_start_time'] = None
+                if self._active.is_long:
+                    target_direction = self._active.target_dir
                     
                     # Track gaze state changes (like the main script does)
-                    if direction == target_direction:
-                        # We're looking in the target direction
-                        if self.step_data['current_gaze_state'] != target_direction:
-                            # New gaze detected - record start time
-                            self.step_data['current_gaze_state'] = target_direction
-                            self.step_data['hold_start_time'] = time.time()
-                        elif self.step_data['current_gaze_state'] == target_direction:
-                            # Continuing the same gaze - check duration
-                            if self.step_data['hold_start_time']:
-                                hold_duration = time.time() - self.step_data['hold_start_time']
-                                
-                                # Check if hold duration is met
-                                if hold_duration >= required_duration:
-                                    # Register this hold completion
-                                    detection['hold_duration'] = hold_duration
-                                    self.step_data['detections'].append(detection)
-                                    
-                                    # Reset tracking to prevent multiple registrations
-                                    self.step_data['current_gaze_state'] = None
-                                    self.step_data['hold_start_time'] = None
-                                    
-                                    print(f"✅ LONG {target_direction} hold completed ({hold_duration:.1f}s)")
-                    else:
-                        # Looking in wrong direction - reset tracking
-                        if self.step_data['current_gaze_state'] == target_direction:
-                            self.step_data['current_gaze_state'] = None
-                            self.step_data['hold_start_time'] = None
+                    state_code, hold_start, completed, hold_duration = _hold_step(
+                        now, _DIR_CODES.get(direction, 0), self._active.target_code,
+                        _DIR_CODES.get(self.step_data.current_gaze_state, 0),
+                        self.step_data.hold_start_time or 0.0, self._active.required_duration)
+                    self.step_data.current_gaze_state = _DIR_NAMES[state_code]
+                    self.step_data.hold_start_time = hold_start or None
+                    
+                    if completed:
+                        # Register this hold completion
+                        detection['hold_duration'] = hold_duration
+                        self.step_data.add_hold(detection)
+                        self._step_dirty = True
+                        
+                        print(f"✅ LONG {target_direction} hold completed ({hold_duration:.1f}s)")
             else:
                 # No direction in this frame, but we might be tracking a hold
-                if ('current_gaze_state' in self.step_data and 
-                    self.step_data['current_gaze_state'] and
-                    'hold_start_time' in self.step_data and 
-                    self.step_data['hold_start_time']):
+                if self.step_data.current_gaze_state and self.step_data.hold_start_time:
                     
                     # Continue tracking the hold even without direction
-                    hold_duration = time.time() - self.step_data['hold_start_time']
+                    hold_duration = now - self.step_data.hold_start_time
                     
                     # Check if hold duration is met
-                    step = self.test_steps[self.current_step]
-                    required_duration = step.get('hold_duration', 5)
-                    if hold_duration >= required_duration:
+                    if hold_duration >= self._active.required_duration:
                         # Register this hold completion
                         detection = {
-                            'timestamp': time.time() - self.step_data['start_time'],
-                            'direction': self.step_data['current_gaze_state'],
+                            'timestamp': now - self.step_data.start_time,
+                            'direction': self.step_data.current_gaze_state,
                             'offset': 0,  # No offset available
                             'is_continuous': True,
                             'hold_duration': hold_duration
                         }
-                        self.step_data['detections'].append(detection)
+                        self.step_data.add_hold(detection)
+                        self._step_dirty = True
                         
                         # Reset tracking to prevent multiple registrations
-                        self.step_data['current_gaze_state'] = None
-                        self.step_data['hold_start_time'] = None
+                        self.step_data.current_gaze_state = None
+                        self.step_data.hold_start_time = None
                         
-                        print(f"✅ LONG {self.step_data['current_gaze_state']} hold completed ({hold_duration:.1f}s)")
+                        print(f"✅ LONG {self.step_data.current_gaze_state} hold completed ({hold_duration:.1f}s)")
         
         # Check if step is complete and auto-advance
         if self.check_step_completion():
@@ -192,7 +261,7 @@ class AutoAdvanceTester:
             return
         
         step = self.test_steps[self.current_step]
-        duration = time.time() - self.step_data['start_time']
+        duration = self.time_fn() - self.step_data.start_time
         
         # Analyze results
         success = self.analyze_step_results(step, self.step_data)
@@ -203,7 +272,7 @@ class AutoAdvanceTester:
             'name': step['name'],
             'success': success,
             'duration': duration,
-            'detections': len(self.step_data['detections']),
+            'detections': len(self.step_data.detections),
             'data': self.step_data
         }
         self.test_results.append(result)
@@ -217,25 +286,26 @@ class AutoAdvanceTester:
         
     def analyze_step_results(self, step, step_data):
         """Analyze step results to determine success"""
-        detections = step_data['detections']
-        if not detections:
+        if not step_data.detections:
             return False
         
-        step_type = step['type']
-        
-        if step_type == 'long_up':
-            up_holds = [d for d in detections if d['direction'] == 'UP' and d.get('hold_duration', 0) > 0]
-            return len(up_holds) >= step.get('repetitions', 3)
+        analyze = self._analyzers.get(step['type'])
+        return analyze(step, step_data) if analyze else False
         
-        elif step_type == 'long_down':
-            down_holds = [d for d in detections if d['direction'] == 'DOWN' and d.get('hold_duration', 0) > 0]
-            return len(down_holds) >= step.get('repetitions', 3)
+    def _analyze_long(self, step, step_data):
+        """Enough completed holds in the step's direction"""
+        return step_data.hold_count('UP' if step['type'] == 'long_up' else 'DOWN') >= step.get('repetitions', 3)
         
-        elif step_type == 'neutral_hold':
-            false_detections = [d for d in detections if d['direction'] in ['UP', 'DOWN']]
-            return len(false_detections) < 3
-        
-        return False
+    def _analyze_neutral(self, step, step_data):
+        """Fewer than three false detections"""
+        # Fails on the third false detection - no need to scan the rest
+        false_detections = 0
+        for d in step_data.detections:
+            if d['direction'] in _UPDOWN:
+                false_detections += 1
+                if false_detections >= 3:
+                    return False
+        return True
         
     def next_step(self):
         """Move to the next step"""
@@ -252,13 +322,25 @@ class AutoAdvanceTester:
         step = self.test_steps[self.current_step]
         print(f"\n📋 Starting: {step['name']}")
         
+        self._step_dirty = False
+        
+        # Resolve the step's settings once, rather than on every gaze frame
+        step_type = step['type']
+        is_quick = step_type in ('quick_up', 'quick_down')
+        target_dir = 'UP' if step_type.endswith('_up') else 'DOWN' if step_type.endswith('_down') else None
+        self._active = SimpleNamespace(
+            type=step_type,
+            target_dir=target_dir,
+            target_code=_DIR_CODES.get(target_dir, 0),
+            required_duration=step.get('hold_duration', 5),  # Default 5 seconds
+            target_count=step.get('target_count', 5) if is_quick else step.get('repetitions', 3),
+            is_quick=is_quick,
+            is_long=step_type in ('long_up', 'long_down'),
+            is_neutral=step_type == 'neutral_hold',
+        )
+        
         # Initialize step data
-        self.step_data = {
-            'detections': [],
-            'start_time': time.time(),
-            'current_gaze_state': None,
-            'hold_start_time': None
-        }
+        self.step_data = StepState(self.time_fn())
         
     def complete_test(self):
         """Complete the entire test"""
@@ -273,6 +355,20 @@ class AutoAdvanceTester:
         print("🧪 Testing Auto-Advance Functionality")
         print("=" * 50)
         
+        # Drive the steps on a fake clock - each hold is two frames 5.5s apart
+        # instead of 5.5s of real frames and sleeps
+        fake_now = [time.monotonic()]  # Non-zero, hold_start_time is truth-tested
+        self.time_fn = lambda: fake_now[0]
+        up = self.simulate_gaze_result('UP', is_continuous=True, gaze_detected=False)
+        down = self.simulate_gaze_result('DOWN', is_continuous=True, gaze_detected=False)
+        neutral = self.simulate_gaze_result(None, is_continuous=False, gaze_detected=False)
+        
+        def hold(gaze_result, duration):
+            """Send gaze_result at the start and end of duration seconds"""
+            self.process_step_gaze(gaze_result)
+            fake_now[0] += duration
+            self.process_step_gaze(gaze_result)
+        
         # Start first step
         self.start_step()
         
@@ -281,41 +377,28 @@ class AutoAdvanceTester:
         for hold_num in range(3):
             print(f"\nHold {hold_num + 1}/3:")
             
-            # Simulate 5 seconds of UP gaze
-            start_time = time.time()
-            while time.time() - start_time < 5.5:  # 5.5 seconds to ensure completion
-                self.process_step_gaze(self.simulate_gaze_result('UP', is_continuous=True, gaze_detected=False))
-                time.sleep(0.1)
+            # 5.5 seconds of UP gaze to ensure completion
+            hold(up, 5.5)
                 
             # Brief neutral break between holds
             if hold_num < 2:  # Don't add neutral after last hold
-                for _ in range(5):  # 0.5 seconds of neutral
-                    self.process_step_gaze(self.simulate_gaze_result(None, is_continuous=False, gaze_detected=False))
-                    time.sleep(0.1)
+                hold(neutral, 0.5)
                     
         # Test Step 2: Long DOWN Holds
         print("\n--- Testing Step 2: Long DOWN Holds ---")
         for hold_num in range(3):
             print(f"\nHold {hold_num + 1}/3:")
             
-            # Simulate 5 seconds of DOWN gaze
-            start_time = time.time()
-            while time.time() - start_time < 5.5:  # 5.5 seconds to ensure completion
-                self.process_step_gaze(self.simulate_gaze_result('DOWN', is_continuous=True, gaze_detected=False))
-                time.sleep(0.1)
+            # 5.5 seconds of DOWN gaze to ensure completion
+            hold(down, 5.5)
                 
             # Brief neutral break between holds
             if hold_num < 2:  # Don't add neutral after last hold
-                for _ in range(5):  # 0.5 seconds of neutral
-                    self.process_step_gaze(self.simulate_gaze_result(None, is_continuous=False, gaze_detected=False))
-                    time.sleep(0.1)
+                hold(neutral, 0.5)
                     
         # Test Step 3: Neutral Hold
         print("\n--- Testing Step 3: Neutral Hold ---")
-        start_time = time.time()
-        while time.time() - start_time < 5.5:  # 5.5 seconds to ensure completion
-            self.process_step_gaze(self.simulate_gaze_result(None, is_continuous=False, gaze_detected=False))
-            time.sleep(0.1)
+        hold(neutral, 5.5)
 
 def main():
     """Run the auto-advance test"""
@@ -15,6 +15,10 @@ class MinimalTester:
         self.root.title("Crash Test")
         self.root.geometry("400x300")
         
+        # Log lines waiting for the next flush (one widget update per 50ms)
+        self._pending_logs = []
+        self._log_pending = False
+        
         # Simple UI
         frame = ttk.Frame(self.root, padding="20")
         frame.pack(fill=tk.BOTH, expand=True)
@@ -29,9 +33,17 @@ class MinimalTester:
     
     def log_result(self, message):
         timestamp = time.strftime("[%H:%M:%S]")
-        self.results_text.insert(tk.END, f"{timestamp} {message}\n")
+        self._pending_logs.append(f"{timestamp} {message}\n")
+        if not self._log_pending:
+            self._log_pending = True
+            self.root.after(50, self._flush_logs)
+    
+    def _flush_logs(self):
+        """Write the buffered log lines to the results text in one insert"""
+        self._log_pending = False
+        self.results_text.insert(tk.END, ''.join(self._pending_logs))
+        self._pending_logs.clear()
         self.results_text.see(tk.END)
-        self.root.update_idletasks()
     
     def start_test(self):
         try:
@@ -5,6 +5,9 @@ Shows quick vs long gaze detection with duration tracking
 """
 
 import cv2
+import numpy as np
+import queue
+import threading
 import time
 import sys
 import os
@@ -14,11 +17,156 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from eye_tracking.gaze_detector import GazeDetector
 from eye_tracking.face_landmarks import FaceLandmarks
-from eye_tracking.calibration_popup import start_calibration_popup, is_calibration_complete, get_calibration_baseline
+from eye_tracking.calibration_popup import start_calibration_popup, get_calibration_event, get_calibration_baseline
 import mediapipe as mp
 
-def test_gaze_detector():
-    """Test the gaze detector with duration tracking"""
+def _put_latest(q, item):
+    """Put item on a 1-slot queue, replacing whatever stale item is still there"""
+    try:
+        q.put_nowait(item)
+    except queue.Full:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            q.put_nowait(item)
+        except queue.Full:  # The other side refilled it - drop this one
+            pass
+
+def _clip_fps(cap):
+    """Frame rate a replayed clip was recorded at (30 if the file doesn't say)"""
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    return fps if fps > 0 else 30.0
+
+def _calibrate_from_clip(cap, face_mesh, face_landmarks, samples_needed, duration=5.0):
+    """Baseline from a replayed clip's opening frames, taken the way the calibration
+    popup does (mean non-blinking pupil_relative); rewinds the clip afterwards"""
+    samples = []
+    for _ in range(int(duration * _clip_fps(cap))):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        results = face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if results.multi_face_landmarks:
+            h, w = frame.shape[:2]
+            avg_pupil_y, forehead_y, chin_y, pupil_relative, is_blinking = face_landmarks.get_gaze_metrics(results.multi_face_landmarks[0], w, h)
+            if not is_blinking:
+                samples.append(pupil_relative)
+                if len(samples) >= samples_needed:
+                    break
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    if len(samples) < samples_needed:
+        return None
+    return float(np.mean(samples))
+
+def _capture_loop(cap, frames, stop, replay=False):
+    """Producer: queue (frame index, frame) pairs - index is None for a live camera.
+    
+    Live frames always replace the queued one so detection sees the freshest;
+    a replayed clip loops forever and hands over every frame at the clip's
+    frame rate, since GazeDetector times gazes against the wall clock.
+    """
+    period = 1.0 / _clip_fps(cap) if replay else 0.0
+    next_frame = time.monotonic()
+    while not stop.is_set():
+        index = int(cap.get(cv2.CAP_PROP_POS_FRAMES)) if replay else None
+        ret, frame = cap.read()
+        if not ret:
+            if replay and index > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Start the clip again
+                continue
+            break
+        if not replay:
+            _put_latest(frames, (index, frame))
+            continue
+        # Absolute frame deadlines, so a slow frame doesn't push the rest back
+        next_frame += period
+        if stop.wait(max(0.0, next_frame - time.monotonic())):
+            break
+        while not stop.is_set():
+            try:
+                frames.put((index, frame), timeout=0.1)
+                break
+            except queue.Full:
+                pass
+    _put_latest(frames, None)  # Camera closed
+
+def _detection_loop(frames, display, stop, face_mesh, face_landmarks, gaze_detector):
+    """Consumer: run face mesh and gaze detection, then hand the frame on for display"""
+    frame_count = 0
+    last_gaze_type = None
+    rgb_buf = None  # RGB copy of the frame, reused every frame once the size is known
+    # Replayed clips: frame index -> (pupil_relative, is_blinking), None = no face.
+    # The whole clip is kept (one small tuple per frame) so every later loop hits
+    metrics_cache = {}
+    
+    while not stop.is_set():
+        try:
+            item = frames.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is None:
+            break
+        index, frame = item
+        
+        frame_count += 1
+        
+        if index is not None and index in metrics_cache:
+            # Replayed frame - same landmarks as last time round
+            metrics = metrics_cache[index]
+        else:
+            # Process frame with MediaPipe
+            if rgb_buf is None or rgb_buf.shape != frame.shape:
+                rgb_buf = np.empty_like(frame)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+            results = face_mesh.process(rgb_buf)
+            
+            metrics = None
+            if results.multi_face_landmarks:
+                landmarks = results.multi_face_landmarks[0]
+                h, w, _ = frame.shape
+                
+                # Get gaze metrics from landmarks
+                avg_pupil_y, forehead_y, chin_y, pupil_relative, is_blinking = face_landmarks.get_gaze_metrics(landmarks, w, h)
+                metrics = (pupil_relative, is_blinking)
+            
+            if index is not None:
+                metrics_cache[index] = metrics
+        
+        if metrics is not None:
+            pupil_relative, is_blinking = metrics
+            
+            # Get gaze result
+            gaze_result = gaze_detector.update(pupil_relative, head_moving=False, is_blinking=is_blinking)
+            
+            if gaze_result and gaze_result.get('gaze_detected', False):
+                direction = gaze_result.get('direction')
+                duration = gaze_result.get('duration', 0)
+                is_long_gaze = gaze_result.get('is_long_gaze', False)
+                
+                # Determine gaze type
+                if is_long_gaze:
+                    gaze_type = f"LONG {direction} GAZE"
+                else:
+                    gaze_type = f"QUICK {direction} GAZE"
+                
+                # Print when gaze type changes or every 5 frames for long gaze
+                if gaze_type != last_gaze_type or (is_long_gaze and frame_count % 5 == 0):
+                    timestamp = time.strftime("%H:%M:%S")
+                    print(f"[{timestamp}] {gaze_type} - Duration: {duration}ms")
+                    last_gaze_type = gaze_type
+            else:
+                # Neutral gaze
+                if last_gaze_type is not None:
+                    print(f"[{time.strftime('%H:%M:%S')}] NEUTRAL GAZE - Stopped continuous action")
+                    last_gaze_type = None
+        
+        _put_latest(display, frame)
+    _put_latest(display, None)  # No more frames
+
+def test_gaze_detector(source=0):
+    """Test the gaze detector with duration tracking (source: camera index or a clip to replay)"""
     
     print("🎯 Testing Gaze Detector with Duration Tracking")
     print("=" * 50)
@@ -42,10 +190,11 @@ def test_gaze_detector():
         min_tracking_confidence=0.5
     )
     
-    # Open camera
-    cap = cv2.VideoCapture(0)
+    # Open camera (or the recorded clip)
+    replay = isinstance(source, str)
+    cap = cv2.VideoCapture(source)
     if not cap.isOpened():
-        print("❌ Could not open camera")
+        print(f"❌ Could not open clip: {source}" if replay else "❌ Could not open camera")
         return
     
     print("📹 Camera opened successfully")
@@ -54,19 +203,23 @@ def test_gaze_detector():
     # Calibration
     print("\n🎯 Starting calibration...")
     
-    # Start calibration popup
-    if not start_calibration_popup(duration=5.0, camera_index=0):
-        print("❌ Failed to start calibration")
-        return
-    
-    print("⏳ Calibrating... (stare at the red dot for 5 seconds)")
-    
-    # Wait for calibration to complete
-    while not is_calibration_complete():
-        time.sleep(0.1)
-    
-    # Get calibration baseline
-    baseline = get_calibration_baseline()
+    if replay:
+        # The clip's face sets the baseline - the live webcam's would not match it
+        print("⏳ Calibrating from the first 5 seconds of the clip...")
+        baseline = _calibrate_from_clip(cap, face_mesh, face_landmarks, gaze_detector.baseline_frames)
+    else:
+        # Start calibration popup
+        if not start_calibration_popup(duration=5.0, camera_index=0):
+            print("❌ Failed to start calibration")
+            return
+        
+        print("⏳ Calibrating... (stare at the red dot for 5 seconds)")
+        
+        # Wait for calibration to complete (a cancelled one leaves no baseline)
+        get_calibration_event().wait(timeout=30)
+        
+        # Get calibration baseline
+        baseline = get_calibration_baseline()
     if baseline is None:
         print("❌ Calibration failed")
         return
@@ -77,56 +230,28 @@ def test_gaze_detector():
     print("✅ Calibration complete!")
     print("\n👁️  Start looking UP or DOWN...")
     
-    # Main detection loop
-    frame_count = 0
-    last_gaze_type = None
+    # Capture and detection run on their own threads; the GUI stays on the
+    # main thread (required on macOS). 1-slot queues keep only the freshest frame.
+    frames = queue.Queue(maxsize=1)
+    display = queue.Queue(maxsize=1)
+    stop = threading.Event()
+    workers = [
+        threading.Thread(target=_capture_loop, args=(cap, frames, stop, replay), daemon=True),
+        threading.Thread(target=_detection_loop, args=(frames, display, stop, face_mesh, face_landmarks, gaze_detector), daemon=True),
+    ]
+    for worker in workers:
+        worker.start()
     
     try:
         while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            frame_count += 1
-            
-            # Process frame with MediaPipe
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = face_mesh.process(rgb_frame)
-            
-            if results.multi_face_landmarks:
-                landmarks = results.multi_face_landmarks[0]
-                h, w, _ = frame.shape
-                
-                # Get gaze metrics from landmarks
-                avg_pupil_y, forehead_y, chin_y, pupil_relative, is_blinking = face_landmarks.get_gaze_metrics(landmarks, w, h)
-                
-                # Get gaze result
-                gaze_result = gaze_detector.update(pupil_relative, head_moving=False, is_blinking=is_blinking)
-                
-                if gaze_result and gaze_result.get('gaze_detected', False):
-                    direction = gaze_result.get('direction')
-                    duration = gaze_result.get('duration', 0)
-                    is_long_gaze = gaze_result.get('is_long_gaze', False)
-                    
-                    # Determine gaze type
-                    if is_long_gaze:
-                        gaze_type = f"LONG {direction} GAZE"
-                    else:
-                        gaze_type = f"QUICK {direction} GAZE"
-                    
-                    # Print when gaze type changes or every 5 frames for long gaze
-                    if gaze_type != last_gaze_type or (is_long_gaze and frame_count % 5 == 0):
-                        timestamp = time.strftime("%H:%M:%S")
-                        print(f"[{timestamp}] {gaze_type} - Duration: {duration}ms")
-                        last_gaze_type = gaze_type
-                else:
-                    # Neutral gaze
-                    if last_gaze_type is not None:
-                        print(f"[{time.strftime('%H:%M:%S')}] NEUTRAL GAZE - Stopped continuous action")
-                        last_gaze_type = None
-            
-            # Display frame
-            cv2.imshow('Gaze Detector Test', frame)
+            # Display the latest processed frame
+            try:
+                frame = display.get(timeout=0.1)
+                if frame is None:
+                    break
+                cv2.imshow('Gaze Detector Test', frame)
+            except queue.Empty:
+                pass  # Nothing new - still pump the window below
             
             # Check for quit
             if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -136,7 +261,10 @@ def test_gaze_detector():
         print("\n⏹️  Test interrupted by user")
     
     finally:
-        # Cleanup
+        # Cleanup - stop the workers before releasing what they use
+        stop.set()
+        for worker in workers:
+            worker.join(timeout=2.0)
         cap.release()
         cv2.destroyAllWindows()
         face_mesh.close()
@@ -145,4 +273,5 @@ def test_gaze_detector():
         print("✅ Test completed")
 
 if __name__ == "__main__":
-    test_gaze_detector()
+    # Optional argument: a recorded clip to replay in a loop instead of the camera
+    test_gaze_detector(sys.argv[1] if len(sys.argv) > 1 else 0)